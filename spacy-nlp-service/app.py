@@ -7,17 +7,28 @@ Provides entity recognition, skill extraction, sentiment analysis, and text clas
 
 import os
 import sys
+import hashlib
 import logging
+import multiprocessing
 import threading
+import tempfile
+import time
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 from datetime import datetime
 
 try:
     import spacy
     from spacy import displacy
+    from spacy.tokens import DocBin
     import torch
-    from flask import Flask, request, jsonify
+    from flask import Flask, request, jsonify, Response, stream_with_context
     from flask_cors import CORS
     import json
     import re
@@ -42,7 +53,19 @@ CORS(app)  # Enable CORS for React frontend
 # Global variables
 nlp_model = None
 model_name = "nl_core_news_sm"  # Dutch spaCy model
-processing_lock = threading.Lock()  # Prevent concurrent processing
+analysis_workers = int(os.getenv('NLP_WORKERS', min(4, os.cpu_count() or 1)))  # Worker processes, each with its own pipeline; 0 analyzes in the request thread
+analysis_queue_size = int(os.getenv('NLP_QUEUE_SIZE', 4 * max(1, analysis_workers)))  # Analyses queued or running at once
+analysis_queue_timeout = float(os.getenv('NLP_QUEUE_TIMEOUT', 30))  # Seconds a request waits for a free slot
+result_cache_size = int(os.getenv('NLP_CACHE_SIZE', 256))  # Analysis results kept in memory
+result_cache_dir = os.getenv('NLP_CACHE_DIR') or None  # Optional directory persisting the cached results
+doc_cache_dir = os.getenv('NLP_DOC_CACHE_DIR') or None  # Optional directory of parsed docs, reused when only the extractors change
+max_batch_documents = 1000  # Upper bound on the documents of one /analyze/batch request
+max_chunk_characters = int(os.getenv('NLP_CHUNK_CHARACTERS', 100000))  # Longer texts are parsed in pieces of at most this size
+max_transcript_sessions = 100  # Incremental transcript analyses kept at once
+transcript_session_ttl = 3600  # Seconds an idle incremental transcript analysis is kept
+
+# Part of the result cache keys: bump whenever the extractors change their output
+EXTRACTOR_VERSION = 1
 
 # Dutch skill patterns and categories
 DUTCH_SKILLS_DATABASE = {
@@ -85,12 +108,329 @@ DUTCH_SKILLS_DATABASE = {
     ]
 }
 
+# context words that make a skill mention more likely to be a real skill
+EXPERIENCE_INDICATORS = frozenset([
+    "ervaring", "jaar", "jaren", "gewerkt", "gebruikt", "ontwikkeld", "expert", "specialist"
+])
+PROJECT_INDICATORS = frozenset(["project", "ontwikkeling", "implementatie", "gebouwd", "gemaakt"])
+
+# lemma lexicons of the rule-based extractors; a lemma may appear in one lexicon only
+POSITIVE_WORDS = frozenset(["goed", "uitstekend", "succesvol", "positief", "sterk", "ervaren", "expert"])
+NEGATIVE_WORDS = frozenset(["slecht", "zwak", "probleem", "moeilijk", "beperkt"])
+EDUCATION_KEYWORDS = frozenset([
+    "universiteit", "hogeschool", "bachelor", "master", "diploma", "certificaat",
+    "opleiding", "studie", "afgestudeerd", "doctoraal", "phd", "mbo", "hbo", "wo"
+])
+
+# patterns for durations of work experience, searched in the lowercased text; each of them
+# must start with a character of EXPERIENCE_FIRST_CHARACTERS
+EXPERIENCE_PATTERNS = [
+    r'(\d+)\s*jaar\s*(ervaring|gewerkt)',
+    r'(\d+)\s*jaren\s*(ervaring|gewerkt)',
+    r'sinds\s*(\d{4})',
+    r'(\d{4})\s*-\s*(\d{4}|\w+)'
+]
+EXPERIENCE_FIRST_CHARACTERS = r'[\ds]'
+
+WORD_PATTERN = re.compile(r"\w+")
+WORD_CHARACTER = re.compile(r"\w")
+
+def build_skill_index(database: Dict[str, List[str]]) -> Dict[str, List[tuple]]:
+    """
+    Index the skills by their first word, so that a single pass over the words of a text
+    finds every skill; entries like "c++" or "ci/cd" are looked up under "c" and "ci"
+    """
+    index = {}
+    for category, skill_list in database.items():
+        for skill in skill_list:
+            first_word = WORD_PATTERN.match(skill.lower())
+            if not first_word:
+                raise ValueError(f"Skills must start with a letter or digit: {skill!r}")
+            index.setdefault(first_word.group(0), []).append((category, skill, skill.lower()))
+    return index
+
+class RuleSet:
+    """
+    The experience, education and sentiment rules, compiled once: the experience patterns
+    into a single regex, the lexicons into a single lemma lookup
+    """
+
+    def __init__(self, experience_patterns: List[str], first_characters: str, lexicons: Dict[str, frozenset]):
+        self.experience_patterns = [re.compile(pattern) for pattern in experience_patterns]
+        # a lookahead matches wherever any of the patterns does without consuming the text, so
+        # that overlapping matches of different patterns ("sinds 2019 - heden") are all found;
+        # the leading character class lets the regex engine skip the positions none can match at
+        self.experience_candidates = re.compile(
+            f"(?={first_characters})(?=" + "|".join(f"(?:{pattern})" for pattern in experience_patterns) + ")"
+        )
+        
+        self.lexicon_names = list(lexicons)
+        self.lexicon = {}
+        for name, words in lexicons.items():
+            for word in words:
+                if word in self.lexicon:
+                    raise ValueError(f"{word!r} is in both the {self.lexicon[word]} and {name} lexicons")
+                self.lexicon[word] = name
+
+    def find_experience(self, text_lower: str) -> List[tuple]:
+        """
+        The (start, end, text) of the experience pattern matches, pattern by pattern, as
+        separate searches for each pattern would find them
+        """
+        matches = [[] for _ in self.experience_patterns]
+        resume_at = [0] * len(self.experience_patterns)
+        for candidate in self.experience_candidates.finditer(text_lower):
+            position = candidate.start()
+            for i, pattern in enumerate(self.experience_patterns):
+                if position < resume_at[i]:
+                    continue
+                match = pattern.match(text_lower, position)
+                if match:
+                    matches[i].append((match.start(), match.end(), match.group(0)))
+                    resume_at[i] = match.end()
+        
+        return [match for pattern_matches in matches for match in pattern_matches]
+
+    def match_lemmas(self, lemmas: List[str]) -> Dict[str, List[int]]:
+        """The indices of the lemmas found in each lexicon"""
+        found = {name: [] for name in self.lexicon_names}
+        lexicon = self.lexicon
+        for i, lemma in enumerate(lemmas):
+            name = lexicon.get(lemma)
+            if name is not None:
+                found[name].append(i)
+        return found
+
+EXTRACTION_RULES = RuleSet(EXPERIENCE_PATTERNS, EXPERIENCE_FIRST_CHARACTERS, {
+    "positive": POSITIVE_WORDS,
+    "negative": NEGATIVE_WORDS,
+    "education": EDUCATION_KEYWORDS
+})
+
+# where a long text may be cut, from most to least preferred: the greedy prefix makes each
+# pattern match up to the last such boundary
+CHUNK_BOUNDARIES = [
+    re.compile(r"(?s).*\n[^\S\n]*\n\s*"),  # paragraph break
+    re.compile(r"(?s).*[.!?]\s+"),  # sentence end
+    re.compile(r"(?s).*\s"),  # any whitespace
+]
+
+def split_text(text: str, max_characters: int) -> List[str]:
+    """
+    Split a text into pieces of at most `max_characters` that concatenate back to the text,
+    cutting at the last paragraph break, else sentence end, else whitespace, in the second
+    half of each piece
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_characters:
+        window = text[start:start + max_characters]
+        cut = max_characters
+        for boundary in CHUNK_BOUNDARIES:
+            match = boundary.match(window)
+            if match and match.end() >= max_characters // 2:
+                cut = match.end()
+                break
+        chunks.append(window[:cut])
+        start += cut
+    chunks.append(text[start:])
+    return chunks
+
+# spaCy components each analysis needs; the others are disabled for the call (None runs them all)
+ANALYSIS_PIPES = {
+    "analyze": None,
+    "skills": [],  # skill matching only looks at tokens and their offsets
+}
+
+class DocData:
+    """Derived data shared by the analysis stages, computed once per doc"""
+
+    def __init__(self, doc, text: str):
+        self.doc = doc
+        self.text = text
+        self.text_lower = text.lower()
+        self.sentences = list(doc.sents) if doc.has_annotation("SENT_START") else []
+        self.lemmas = [token.lemma_.lower() for token in doc]
+        self.words = [token for token in doc if token.is_alpha]
+        self.unique_word_lemmas = set(self.lemmas[token.i] for token in self.words)
+
+class SegmentTimeline:
+    """
+    Maps character offsets in the text of a Whisper segment to times in the audio: to the
+    words they fall in when the segment has word timestamps, else to the whole segment
+    """
+
+    def __init__(self, segment: Dict[str, Any]):
+        self.start = segment["start"]
+        self.end = segment["end"]
+        self.words = []
+        self.word_starts = []
+        
+        # Whisper's words concatenate to the segment text; if they don't, e.g. after editing,
+        # the word offsets would be off and only the segment times are used
+        words = segment.get("words") or []
+        if words and "".join(word.get("word", "") for word in words) == segment["text"]:
+            position = 0
+            for word in words:
+                self.words.append(word)
+                self.word_starts.append(position)
+                position += len(word["word"])
+
+    def span(self, start: int, end: int) -> tuple:
+        """The start and end time of the characters from `start` to `end`"""
+        if not self.words:
+            return self.start, self.end
+
+        first = max(0, bisect_right(self.word_starts, start) - 1)
+        last = max(first, bisect_right(self.word_starts, max(start, end - 1)) - 1)
+        return self.words[first].get("start", self.start), self.words[last].get("end", self.end)
+
+def shift_hit(hit: Dict[str, Any], offset: int) -> Dict[str, Any]:
+    """A hit found in a chunk of a text, at its character offsets in the whole text"""
+    return dict(hit, start=hit["start"] + offset, end=hit["end"] + offset)
+
+def cache_hit(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A cached result as returned to a client: marked as a cache hit, with the current time, and
+    without the stage timings, which measured the request that computed it
+    """
+    if "processing_info" not in result:
+        # /skills results carry their timings at the top level
+        return {**{key: value for key, value in result.items() if key != "timings_ms"}, "cache": "hit"}
+
+    processing_info = {key: value for key, value in result["processing_info"].items() if key != "timings_ms"}
+    processing_info["timestamp"] = datetime.now().isoformat()
+    processing_info["cache"] = "hit"
+    return {**result, "processing_info": processing_info}
+
+class ResultCache:
+    """
+    LRU cache of analysis results keyed by content hash, optionally backed by a directory of
+    JSON files that survives restarts and is shared between service instances
+    """
+
+    def __init__(self, max_entries: int, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        result = self._read(key)
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        with self.lock:
+            self._remember(key, result)
+        self._write(key, result)
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached result {key}: {e}")
+            return None
+
+    def _write(self, key: str, result: Dict[str, Any]):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # written to a temporary file first, so that readers never see a partial result
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.cache_dir, delete=False) as f:
+                json.dump(result, f)
+            os.replace(f.name, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to persist cached result {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "persistent": self.cache_dir is not None
+        }
+
+class DocCache:
+    """
+    Directory of parsed docs, each serialized in its own DocBin file, so that a changed
+    extractor reruns on the stored parses instead of the whole pipeline. One file per doc
+    lets every worker process read and write the store without coordinating with the others.
+    Long texts are stored as the docs of their chunks.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.spacy")
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str, vocab):
+        try:
+            with open(self._path(key), "rb") as f:
+                doc_bin = DocBin().from_bytes(f.read())
+            return next(iter(doc_bin.get_docs(vocab)))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached doc {key}: {e}")
+            return None
+
+    def put(self, key: str, doc):
+        doc_bin = DocBin(store_user_data=False, docs=[doc])
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile("wb", dir=self.cache_dir, delete=False) as f:
+                f.write(doc_bin.to_bytes())
+            os.replace(f.name, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to persist cached doc {key}: {e}")
+
 class DutchNLPService:
     """Advanced Dutch NLP Service using spaCy"""
 
     def __init__(self, model_name: str = "nl_core_news_sm"):
         self.model_name = model_name
         self.nlp = None
+        self.skill_index = build_skill_index(DUTCH_SKILLS_DATABASE)
+        self.rules = EXTRACTION_RULES
+        self.result_cache = ResultCache(result_cache_size, result_cache_dir)
+        self.doc_cache = DocCache(doc_cache_dir) if doc_cache_dir else None
         self.load_model()
 
     def load_model(self):
@@ -107,6 +447,118 @@ class DutchNLPService:
             logger.error(f"Failed to load spaCy model: {e}")
             raise
 
+    def cache_key(self, text: str, analysis: str = "analyze") -> str:
+        """
+        Hash of the text, the model and the extractor version. The text isn't normalized beyond
+        its encoding: the results hold character offsets, which must match the exact text.
+        """
+        content = f"{self.model_name}\0{EXTRACTOR_VERSION}\0{analysis}\0{text}"
+        return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+    def cached(self, analysis: str, text: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """The cached result of `analysis` on `text`, calling `compute` to produce it on a miss"""
+        key = self.cache_key(text, analysis)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = compute()
+            self.result_cache.put(key, result)
+            return result
+        return cache_hit(result)
+
+    def doc_key(self, text: str) -> str:
+        """
+        Hash of the text and the pipeline that parses it, leaving out the extractor version so
+        that stored parses outlive changes to the extractors
+        """
+        content = f"{self.model_name}\0{self.nlp.meta.get('version')}\0{','.join(self.nlp.pipe_names)}\0{text}"
+        return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+    def _cached_doc(self, text: str):
+        """The stored parse of `text`, if there's a doc cache holding it"""
+        if self.doc_cache is None:
+            return None
+
+        doc = self.doc_cache.get(self.doc_key(text), self.nlp.vocab)
+        return doc if doc is not None and doc.text == text else None
+
+    def _disabled_pipes(self, analysis: str) -> List[str]:
+        """The spaCy components `analysis` doesn't need"""
+        enable = ANALYSIS_PIPES[analysis]
+        if enable is None:
+            return []
+
+        return [name for name in self.nlp.pipe_names if name not in enable]
+
+    def _split(self, text: str) -> List[str]:
+        """
+        Split `text` into chunks for the pipeline: a long text is parsed piece by piece, which
+        bounds the pipeline's memory use and keeps it under nlp.max_length
+        """
+        chunks = split_text(text, max_chunk_characters)
+        if len(chunks) > 1:
+            logger.info(f"Processing text of {len(text)} characters in {len(chunks)} chunks")
+        return chunks
+
+    def _stored_chunks(self, chunks: List[str], analysis: str = "analyze") -> List[bool]:
+        """Which of the chunks have a parse in the doc cache, which only holds full-pipeline parses"""
+        if self.doc_cache is None or analysis != "analyze":
+            return [False] * len(chunks)
+
+        return [self.doc_cache.contains(self.doc_key(chunk)) for chunk in chunks]
+
+    def chunk_docs(self, chunks: List[str], analysis: str = "analyze", stored: Optional[List[bool]] = None, parsed=None):
+        """
+        Run the spaCy pipeline with only the components `analysis` needs on the consecutive
+        chunks of a text, one at a time, so that each doc can be dropped before the next
+        
+        Args:
+            chunks: The text split by _split()
+            analysis: The analysis the docs are for; parses of the full pipeline are loaded
+                from and stored in the doc cache
+            stored: Which of the chunks have a stored parse, from _stored_chunks()
+            parsed: The docs of the chunks without a stored parse, in order, as from nlp.pipe;
+                without it each chunk is parsed when it's reached
+            
+        Yields:
+            The doc of each chunk, with the offsets of the chunk
+        """
+        # disabled per call rather than with nlp.select_pipes, which would change the
+        # pipeline shared with concurrent requests
+        disable = self._disabled_pipes(analysis)
+        if stored is None:
+            stored = self._stored_chunks(chunks, analysis)
+        
+        for chunk, is_stored in zip(chunks, stored):
+            doc = self._cached_doc(chunk) if is_stored else None
+            if doc is None:
+                # an unreadable stored parse has no doc in `parsed`
+                doc = self.nlp(chunk, disable=disable) if is_stored or parsed is None else next(parsed)
+                if analysis == "analyze" and self.doc_cache is not None:
+                    self.doc_cache.put(self.doc_key(chunk), doc)
+            yield doc
+
+    def _timed_docs(self, docs, timings: Dict[str, float]):
+        """
+        The docs of consecutive chunks with the offsets of the chunks in the whole text, adding
+        the time waiting for each doc to the pipeline stage
+        """
+        offset = 0
+        while True:
+            with self._timed(timings, "pipeline"):
+                doc = next(docs, None)
+            if doc is None:
+                return
+            yield offset, doc
+            offset += len(doc.text)
+
+    @contextmanager
+    def _timed(self, timings: Dict[str, float], stage: str):
+        """Record the duration of a stage in milliseconds, adding up repeated stages"""
+        start = time.perf_counter()
+        yield
+        elapsed = (time.perf_counter() - start) * 1000
+        timings[stage] = round(timings.get(stage, 0) + elapsed, 2)
+
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """
         Comprehensive text analysis using spaCy
@@ -120,58 +572,263 @@ class DutchNLPService:
         try:
             logger.info(f"Analyzing text of length: {len(text)} characters")
             
-            # Process text with spaCy
-            doc = self.nlp(text)
+            # Process text with spaCy, chunk by chunk
+            return self.analyze_chunks(text, self.chunk_docs(self._split(text)), {})
             
-            # Extract entities
-            entities = self._extract_entities(doc)
+        except Exception as e:
+            logger.error(f"Text analysis failed: {e}")
+            raise
+
+    def analyze_batch(self, documents: List[Dict[str, Any]], batch_size: Optional[int] = None):
+        """
+        Analyze many texts with nlp.pipe, yielding each document's result as soon as it's done
+        
+        Args:
+            documents: Dictionaries with the "id" and "text" of each document
+            batch_size: Number of texts spaCy processes together
             
-            # Extract skills
-            skills = self._extract_skills(doc, text)
+        Yields:
+            Dictionary with the id, and the analysis result or the error, of each document
+        """
+        # cached documents are answered right away, as are the ones with a stored parse; the
+        # others go through the pipeline
+        pending = []
+        for document in documents:
+            key = self.cache_key(document["text"])
+            result = self.result_cache.get(key)
+            if result is not None:
+                yield {"id": document["id"], "success": True, "result": cache_hit(result)}
+                continue
             
-            # Analyze syntax
-            syntax_analysis = self._analyze_syntax(doc)
+            chunks = self._split(document["text"])
+            stored = self._stored_chunks(chunks)
+            if all(stored):
+                yield self._analyze_batch_doc(document, key, self.chunk_docs(chunks, stored=stored))
+            else:
+                pending.append((document, key, chunks, stored))
+        
+        # the chunks without a stored parse, of all pending documents, go through nlp.pipe
+        # together; each document is analyzed as its docs come out
+        parsed = self.nlp.pipe(
+            (
+                chunk
+                for _, _, chunks, stored in pending
+                for chunk, is_stored in zip(chunks, stored)
+                if not is_stored
+            ),
+            batch_size=batch_size,
+            disable=self._disabled_pipes("analyze")
+        )
+        for document, key, chunks, stored in pending:
+            yield self._analyze_batch_doc(document, key, self.chunk_docs(chunks, stored=stored, parsed=parsed))
+
+    def _analyze_batch_doc(self, document: Dict[str, Any], key: str, docs) -> Dict[str, Any]:
+        """The line of an /analyze/batch response for one document, from the docs of its chunks"""
+        try:
+            result = self.analyze_chunks(document["text"], docs, {})
+            self.result_cache.put(key, result)
+            return {"id": document["id"], "success": True, "result": result}
+        except Exception as e:
+            logger.error(f"Text analysis of document {document['id']} failed: {e}")
+            # the docs of the next documents come after the rest of this one's
+            for _ in docs:
+                pass
+            return {"id": document["id"], "success": False, "error": str(e)}
+
+    def analyze_chunks(self, text: str, docs, timings: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Run all extractors on the docs of the consecutive chunks of `text`, adding their
+        durations to `timings`. The hits of each chunk are moved to their offsets in the whole
+        text and its counts added up, so that its doc is dropped before the next one is taken
+        from `docs`: the memory held stays bounded by the chunk size, not the text length.
+        """
+        text_lower = text.lower()
+        
+        # Skills and experience are matched on the whole text, so that no match is split at a
+        # chunk boundary; the docs only score the skill matches
+        with self._timed(timings, "skills"):
+            skill_matches = self._find_skills(text_lower)
+            skill_confidences = {}
+        
+        with self._timed(timings, "experience"):
+            experience = self._extract_experience(text_lower)
+        
+        entities = {}
+        pos_counts = {}
+        dep_counts = {}
+        noun_chunks = []
+        technical_terms = []
+        sentiment_counts = {"positive": 0, "negative": 0}
+        education = []
+        tokens = words = sentences = 0
+        word_lemmas = set()
+        
+        for offset, doc in self._timed_docs(docs, timings):
+            with self._timed(timings, "doc_data"):
+                data = DocData(doc, doc.text)
             
-            # Extract key phrases
-            key_phrases = self._extract_key_phrases(doc)
+            # Extract entities
+            with self._timed(timings, "entities"):
+                for category, hits in self._extract_entities(doc).items():
+                    entities.setdefault(category, []).extend(shift_hit(hit, offset) for hit in hits)
             
-            # Analyze sentiment (basic)
-            sentiment = self._analyze_sentiment(doc)
+            # Score the skills found in this chunk
+            with self._timed(timings, "skills"):
+                self._score_skills(doc, offset, skill_matches, skill_confidences)
             
-            # Extract experience information
-            experience = self._extract_experience(doc, text)
+            # Count the tags for the syntax analysis
+            with self._timed(timings, "syntax"):
+                self._count_tags(doc, pos_counts, dep_counts)
             
-            # Extract education information
-            education = self._extract_education(doc, text)
+            # Extract key phrases, up to 20 of each kind
+            with self._timed(timings, "key_phrases"):
+                chunk_noun_chunks, chunk_terms = self._extract_key_phrases(doc)
+                noun_chunks.extend(shift_hit(hit, offset) for hit in chunk_noun_chunks[:20 - len(noun_chunks)])
+                technical_terms.extend(shift_hit(hit, offset) for hit in chunk_terms[:20 - len(technical_terms)])
             
-            # Calculate text statistics
-            statistics = self._calculate_statistics(doc, text)
+            # Look up the lexicon words, for sentiment and education, in one pass
+            with self._timed(timings, "lexicons"):
+                lemma_matches = self.rules.match_lemmas(data.lemmas)
+                sentiment_counts["positive"] += len(lemma_matches["positive"])
+                sentiment_counts["negative"] += len(lemma_matches["negative"])
             
-            result = {
-                "entities": entities,
-                "skills": skills,
-                "syntax": syntax_analysis,
-                "key_phrases": key_phrases,
-                "sentiment": sentiment,
-                "experience": experience,
-                "education": education,
-                "statistics": statistics,
-                "processing_info": {
-                    "model": self.model_name,
-                    "language": "nl",
-                    "timestamp": datetime.now().isoformat(),
-                    "text_length": len(text),
-                    "tokens": len(doc),
-                    "sentences": len(list(doc.sents))
-                }
+            # Extract education information
+            with self._timed(timings, "education"):
+                education.extend(shift_hit(hit, offset) for hit in self._extract_education(data, lemma_matches))
+            
+            tokens += len(doc)
+            words += len(data.words)
+            sentences += len(data.sentences)
+            word_lemmas.update(data.unique_word_lemmas)
+        
+        with self._timed(timings, "skills"):
+            skills = self._collect_skills(text, skill_matches, skill_confidences)
+        
+        # Analyze syntax
+        with self._timed(timings, "syntax"):
+            syntax_analysis = self._analyze_syntax(pos_counts, dep_counts, tokens, sentences, words, len(word_lemmas))
+        
+        # Noun chunks first, then technical terms
+        key_phrases = (noun_chunks + technical_terms)[:20]
+        
+        # Analyze sentiment (basic)
+        with self._timed(timings, "sentiment"):
+            sentiment = self._score_sentiment(sentiment_counts["positive"], sentiment_counts["negative"])
+        
+        # Calculate text statistics
+        with self._timed(timings, "statistics"):
+            statistics = self._summarize_statistics(len(text), words, sentences, len(word_lemmas))
+        
+        result = {
+            "entities": entities,
+            "skills": skills,
+            "syntax": syntax_analysis,
+            "key_phrases": key_phrases,
+            "sentiment": sentiment,
+            "experience": experience,
+            "education": education,
+            "statistics": statistics,
+            "processing_info": {
+                "model": self.model_name,
+                "language": "nl",
+                "timestamp": datetime.now().isoformat(),
+                "text_length": len(text),
+                "tokens": tokens,
+                "sentences": sentences,
+                "timings_ms": timings
             }
+        }
+        
+        logger.info(f"Text analysis completed. Found {len(entities)} entities, {sum(len(cat) for cat in skills.values())} skills")
+        return result
+
+    def extract_skills(self, text: str) -> Dict[str, Any]:
+        """Extract skills only, running just the tokenizer"""
+        timings = {}
+        with self._timed(timings, "skills"):
+            matches = self._find_skills(text.lower())
+            confidences = {}
+        for offset, doc in self._timed_docs(self.chunk_docs(self._split(text), "skills"), timings):
+            with self._timed(timings, "skills"):
+                self._score_skills(doc, offset, matches, confidences)
+        with self._timed(timings, "skills"):
+            skills = self._collect_skills(text, matches, confidences)
+
+        return {"skills": skills, "timings_ms": timings}
+
+    def analyze_segments(self, segments: List[Dict[str, Any]], offset: int = 0) -> Dict[str, Any]:
+        """
+        Analyze transcript segments, each as its own doc, for incremental transcript analysis
+        
+        Args:
+            segments: Whisper segments with "start", "end", "text" and optionally "words"
+            offset: Length of the transcript text before the first of these segments
             
-            logger.info(f"Text analysis completed. Found {len(entities)} entities, {sum(len(cat) for cat in skills.values())} skills")
-            return result
+        Returns:
+            Dictionary with the hits of each segment, at their character offsets in the whole
+            transcript and their times in the audio, and the counts to add to the running totals
+        """
+        results = []
+        counts = {"characters": 0, "words": 0, "sentences": 0, "positive": 0, "negative": 0}
+        word_lemmas = set()
+        
+        docs = self.nlp.pipe(segment["text"] for segment in segments)
+        for segment, doc in zip(segments, docs):
+            text = segment["text"]
+            data = DocData(doc, text)
+            lemma_matches = self.rules.match_lemmas(data.lemmas)
+            timeline = SegmentTimeline(segment)
             
-        except Exception as e:
-            logger.error(f"Text analysis failed: {e}")
-            raise
+            def place(hit: Dict[str, Any], **fields) -> Dict[str, Any]:
+                audio_start, audio_end = timeline.span(hit["start"], hit["end"])
+                return dict(
+                    hit,
+                    start=hit["start"] + offset,
+                    end=hit["end"] + offset,
+                    audio_start=audio_start,
+                    audio_end=audio_end,
+                    **fields
+                )
+            
+            results.append({
+                "id": segment.get("id"),
+                "start": segment["start"],
+                "end": segment["end"],
+                "entities": [
+                    place(entity, category=category)
+                    for category, entities in self._extract_entities(doc).items()
+                    for entity in entities
+                ],
+                "skills": [
+                    place(skill, category=category)
+                    for category, skills in self._extract_skills(doc, text).items()
+                    for skill in skills
+                ],
+                "experience": [place(hit) for hit in self._extract_experience(data.text_lower)],
+                "education": [place(hit) for hit in self._extract_education(data, lemma_matches)]
+            })
+            
+            counts["characters"] += len(text)
+            counts["words"] += len(data.words)
+            counts["sentences"] += len(data.sentences)
+            counts["positive"] += len(lemma_matches["positive"])
+            counts["negative"] += len(lemma_matches["negative"])
+            word_lemmas.update(data.unique_word_lemmas)
+            offset += len(text)
+        
+        return {"segments": results, "counts": counts, "word_lemmas": sorted(word_lemmas)}
+
+    def summarize_transcript(self, session: "TranscriptSession") -> Dict[str, Any]:
+        """The running totals of an incremental transcript analysis"""
+        counts = session.counts
+        return {
+            "segments": session.segment_count,
+            "skills": session.skill_counts,
+            "sentiment": self._score_sentiment(counts["positive"], counts["negative"]),
+            "statistics": self._summarize_statistics(
+                counts["characters"], counts["words"], counts["sentences"], len(session.word_lemmas)
+            )
+        }
 
     def _extract_entities(self, doc) -> Dict[str, List[Dict]]:
         """Extract named entities from text"""
@@ -210,6 +867,45 @@ class DutchNLPService:
 
     def _extract_skills(self, doc, text: str) -> Dict[str, List[Dict]]:
         """Extract skills from text using pattern matching and NLP"""
+        matches = self._find_skills(text.lower())
+        confidences = {}
+        self._score_skills(doc, 0, matches, confidences)
+        return self._collect_skills(text, matches, confidences)
+
+    def _find_skills(self, text_lower: str) -> Dict[tuple, List[tuple]]:
+        """The offsets of the matches of each skill, by category and skill"""
+        # Find all skills in a single pass over the words: a skill matches where a word
+        # starts with it and it isn't followed by another word character
+        matches = {}
+        for word in WORD_PATTERN.finditer(text_lower):
+            start = word.start()
+            for category, skill, skill_lower in self.skill_index.get(word.group(0), ()):
+                end = start + len(skill_lower)
+                if text_lower.startswith(skill_lower, start) and not WORD_CHARACTER.match(text_lower, end):
+                    matches.setdefault((category, skill), []).append((start, end))
+        
+        return matches
+
+    def _score_skills(self, doc, offset: int, matches: Dict[tuple, List[tuple]], confidences: Dict[tuple, float]):
+        """
+        Add the confidences of the skill matches starting in `doc`, the chunk of the text at
+        `offset`, to `confidences`
+        """
+        end_offset = offset + len(doc.text)
+        
+        # Character offsets of the tokens, to find the token of each match by bisection
+        token_starts = [token.idx for token in doc]
+        
+        for (category, skill), spans in matches.items():
+            for start, end in spans:
+                if offset <= start < end_offset:
+                    # Calculate confidence based on context
+                    confidences[category, skill, start] = self._calculate_skill_confidence(
+                        doc, skill, start - offset, end - offset, token_starts
+                    )
+
+    def _collect_skills(self, text: str, matches: Dict[tuple, List[tuple]], confidences: Dict[tuple, float]) -> Dict[str, List[Dict]]:
+        """The scored skill matches by category, without duplicates"""
         skills = {
             "programming_languages": [],
             "frameworks": [],
@@ -221,25 +917,16 @@ class DutchNLPService:
             "languages": []
         }
         
-        text_lower = text.lower()
-        
         # Extract skills by category
         for category, skill_list in DUTCH_SKILLS_DATABASE.items():
             for skill in skill_list:
-                # Use regex for more precise matching
-                pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-                matches = re.finditer(pattern, text_lower)
-                
-                for match in matches:
-                    # Calculate confidence based on context
-                    confidence = self._calculate_skill_confidence(doc, skill, match.start(), match.end())
-                    
+                for start, end in matches.get((category, skill), ()):
                     skill_info = {
                         "name": skill,
-                        "confidence": confidence,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "context": self._get_context(text, match.start(), match.end())
+                        "confidence": confidences[category, skill, start],
+                        "start": start,
+                        "end": end,
+                        "context": self._get_context(text, start, end)
                     }
                     
                     skills[category].append(skill_info)
@@ -250,33 +937,26 @@ class DutchNLPService:
         
         return skills
 
-    def _calculate_skill_confidence(self, doc, skill: str, start: int, end: int) -> float:
+    def _calculate_skill_confidence(self, doc, skill: str, start: int, end: int, token_starts: Optional[List[int]] = None) -> float:
         """Calculate confidence score for a skill based on context"""
         base_confidence = 0.7
         
-        # Find the token containing this skill
-        skill_token = None
-        for token in doc:
-            if token.idx <= start < token.idx + len(token.text):
-                skill_token = token
-                break
-        
-        if not skill_token:
+        # Find the token containing this skill: the last one starting at or before it
+        if token_starts is None:
+            token_starts = [token.idx for token in doc]
+        i = bisect_right(token_starts, start) - 1
+        if i < 0 or start >= token_starts[i] + len(doc[i].text):
             return base_confidence
         
         # Boost confidence based on context
-        context_words = []
-        for i in range(max(0, skill_token.i - 3), min(len(doc), skill_token.i + 4)):
-            context_words.append(doc[i].text.lower())
+        context_words = set(token.lower_ for token in doc[max(0, i - 3):i + 4])
         
         # Experience indicators
-        experience_indicators = ["ervaring", "jaar", "jaren", "gewerkt", "gebruikt", "ontwikkeld", "expert", "specialist"]
-        if any(indicator in context_words for indicator in experience_indicators):
+        if not EXPERIENCE_INDICATORS.isdisjoint(context_words):
             base_confidence += 0.2
         
         # Project indicators
-        project_indicators = ["project", "ontwikkeling", "implementatie", "gebouwd", "gemaakt"]
-        if any(indicator in context_words for indicator in project_indicators):
+        if not PROJECT_INDICATORS.isdisjoint(context_words):
             base_confidence += 0.1
         
         return min(base_confidence, 1.0)
@@ -297,86 +977,81 @@ class DutchNLPService:
         
         return sorted(skill_dict.values(), key=lambda x: x["confidence"], reverse=True)
 
-    def _analyze_syntax(self, doc) -> Dict[str, Any]:
-        """Analyze syntactic structure of text"""
-        pos_counts = {}
-        dep_counts = {}
-        
+    def _count_tags(self, doc, pos_counts: Dict[str, int], dep_counts: Dict[str, int]):
+        """Add the part-of-speech and dependency counts of `doc`"""
         for token in doc:
             # Part-of-speech counts
             pos_counts[token.pos_] = pos_counts.get(token.pos_, 0) + 1
             
             # Dependency relation counts
             dep_counts[token.dep_] = dep_counts.get(token.dep_, 0) + 1
-        
+
+    def _analyze_syntax(self, pos_counts: Dict[str, int], dep_counts: Dict[str, int], tokens: int, sentences: int, words: int, unique_words: int) -> Dict[str, Any]:
+        """Analyze syntactic structure of text"""
         return {
             "pos_distribution": pos_counts,
             "dependency_distribution": dep_counts,
-            "sentence_count": len(list(doc.sents)),
-            "token_count": len(doc),
-            "complexity_score": self._calculate_complexity(doc)
+            "sentence_count": sentences,
+            "token_count": tokens,
+            "complexity_score": self._calculate_complexity(tokens, sentences, words, unique_words)
         }
 
-    def _calculate_complexity(self, doc) -> float:
+    def _calculate_complexity(self, tokens: int, sentences: int, words: int, unique_words: int) -> float:
         """Calculate text complexity score"""
-        sentences = list(doc.sents)
         if not sentences:
             return 0.0
         
         # Average sentence length
-        avg_sentence_length = len(doc) / len(sentences)
+        avg_sentence_length = tokens / sentences
         
         # Unique words ratio
-        unique_words = len(set(token.lemma_.lower() for token in doc if token.is_alpha))
-        total_words = len([token for token in doc if token.is_alpha])
-        unique_ratio = unique_words / total_words if total_words > 0 else 0
+        unique_ratio = unique_words / words if words > 0 else 0
         
         # Complexity based on sentence length and vocabulary diversity
         complexity = (avg_sentence_length / 20) + unique_ratio
         return min(complexity, 1.0)
 
-    def _extract_key_phrases(self, doc) -> List[Dict]:
-        """Extract key phrases using noun chunks and named entities"""
-        key_phrases = []
-        
-        # Extract noun chunks
-        for chunk in doc.noun_chunks:
-            if len(chunk.text.split()) >= 2:  # Multi-word phrases
-                key_phrases.append({
-                    "text": chunk.text,
-                    "type": "noun_chunk",
-                    "start": chunk.start_char,
-                    "end": chunk.end_char
-                })
+    def _extract_key_phrases(self, doc) -> tuple:
+        """
+        Extract key phrases using noun chunks and compound words, up to 20 of each
+        
+        Returns:
+            The noun chunks and the technical terms
+        """
+        noun_chunks = []
+        technical_terms = []
+        
+        # Extract noun chunks, which need the parser
+        if doc.has_annotation("DEP"):
+            for chunk in doc.noun_chunks:
+                if len(chunk.text.split()) >= 2:  # Multi-word phrases
+                    noun_chunks.append({
+                        "text": chunk.text,
+                        "type": "noun_chunk",
+                        "start": chunk.start_char,
+                        "end": chunk.end_char
+                    })
+                    if len(noun_chunks) == 20:
+                        break
         
         # Extract compound words and technical terms
         for token in doc:
             if (token.pos_ in ["NOUN", "PROPN"] and 
                 len(token.text) > 6 and 
                 not token.is_stop):
-                key_phrases.append({
+                technical_terms.append({
                     "text": token.text,
                     "type": "technical_term",
                     "start": token.idx,
                     "end": token.idx + len(token.text)
                 })
+                if len(technical_terms) == 20:
+                    break
         
-        return key_phrases[:20]  # Return top 20 key phrases
+        return noun_chunks, technical_terms
 
-    def _analyze_sentiment(self, doc) -> Dict[str, Any]:
-        """Basic sentiment analysis (can be enhanced with specialized models)"""
-        positive_words = ["goed", "uitstekend", "succesvol", "positief", "sterk", "ervaren", "expert"]
-        negative_words = ["slecht", "zwak", "probleem", "moeilijk", "beperkt"]
-        
-        positive_count = 0
-        negative_count = 0
-        
-        for token in doc:
-            if token.lemma_.lower() in positive_words:
-                positive_count += 1
-            elif token.lemma_.lower() in negative_words:
-                negative_count += 1
-        
+    def _score_sentiment(self, positive_count: int, negative_count: int) -> Dict[str, Any]:
+        """Sentiment from the numbers of positive and negative words"""
         total_sentiment_words = positive_count + negative_count
         if total_sentiment_words == 0:
             sentiment_score = 0.5  # Neutral
@@ -390,63 +1065,44 @@ class DutchNLPService:
             "overall": "positive" if sentiment_score > 0.6 else "negative" if sentiment_score < 0.4 else "neutral"
         }
 
-    def _extract_experience(self, doc, text: str) -> List[Dict]:
+    def _extract_experience(self, text_lower: str) -> List[Dict]:
         """Extract work experience information"""
         experience = []
         
-        # Pattern for years of experience
-        year_patterns = [
-            r'(\d+)\s*jaar\s*(ervaring|gewerkt)',
-            r'(\d+)\s*jaren\s*(ervaring|gewerkt)',
-            r'sinds\s*(\d{4})',
-            r'(\d{4})\s*-\s*(\d{4}|\w+)'
-        ]
-        
-        for pattern in year_patterns:
-            matches = re.finditer(pattern, text.lower())
-            for match in matches:
-                experience.append({
-                    "text": match.group(0),
-                    "type": "duration",
-                    "start": match.start(),
-                    "end": match.end()
-                })
+        for start, end, text in self.rules.find_experience(text_lower):
+            experience.append({
+                "text": text,
+                "type": "duration",
+                "start": start,
+                "end": end
+            })
         
         return experience
 
-    def _extract_education(self, doc, text: str) -> List[Dict]:
+    def _extract_education(self, data: DocData, lemma_matches: Dict[str, List[int]]) -> List[Dict]:
         """Extract education information"""
         education = []
         
-        # Education keywords
-        education_keywords = [
-            "universiteit", "hogeschool", "bachelor", "master", "diploma", "certificaat",
-            "opleiding", "studie", "afgestudeerd", "doctoraal", "phd", "mbo", "hbo", "wo"
-        ]
-        
-        for token in doc:
-            if token.lemma_.lower() in education_keywords:
-                education.append({
-                    "text": token.text,
-                    "type": "education_keyword",
-                    "start": token.idx,
-                    "end": token.idx + len(token.text)
-                })
+        for i in lemma_matches["education"]:
+            token = data.doc[i]
+            education.append({
+                "text": token.text,
+                "type": "education_keyword",
+                "start": token.idx,
+                "end": token.idx + len(token.text)
+            })
         
         return education
 
-    def _calculate_statistics(self, doc, text: str) -> Dict[str, Any]:
-        """Calculate text statistics"""
-        sentences = list(doc.sents)
-        words = [token for token in doc if token.is_alpha]
-        
+    def _summarize_statistics(self, characters: int, words: int, sentences: int, unique_words: int) -> Dict[str, Any]:
+        """Text statistics from the counts of characters, words, sentences and distinct word lemmas"""
         return {
-            "character_count": len(text),
-            "word_count": len(words),
-            "sentence_count": len(sentences),
-            "average_words_per_sentence": len(words) / len(sentences) if sentences else 0,
-            "unique_words": len(set(token.lemma_.lower() for token in words)),
-            "lexical_diversity": len(set(token.lemma_.lower() for token in words)) / len(words) if words else 0
+            "character_count": characters,
+            "word_count": words,
+            "sentence_count": sentences,
+            "average_words_per_sentence": words / sentences if sentences else 0,
+            "unique_words": unique_words,
+            "lexical_diversity": unique_words / words if words else 0
         }
 
 # Initialize NLP service
@@ -456,6 +1112,170 @@ except Exception as e:
     logger.error(f"Failed to initialize NLP service: {e}")
     nlp_service = None
 
+class ServiceBusyError(Exception):
+    """Raised when no analysis slot frees up within the queue timeout"""
+
+def _run_in_worker(method: str, *args):
+    """Run a DutchNLPService method in a pool worker, on the worker's own copy of the pipeline"""
+    if nlp_service is None:
+        raise RuntimeError("NLP service not available in worker process")
+    return getattr(nlp_service, method)(*args)
+
+class AnalysisPool:
+    """
+    Runs analyses in parallel in worker processes, each holding a replica of the spaCy pipeline
+    
+    At most `queue_size` analyses are queued or running at once. Further requests wait up to
+    `queue_timeout` seconds for a slot instead of being rejected outright, which pushes back
+    on clients when the service is saturated.
+    """
+
+    def __init__(self, workers: int, queue_size: int, queue_timeout: float):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.in_flight = 0
+        self.counter_lock = threading.Lock()
+        self.executor = self._create_executor()
+
+    def _create_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers == 0:
+            return None
+
+        # spawned rather than forked: forking the threaded web server can deadlock, and each
+        # spawned worker loads its own pipeline when it imports this module
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def acquire(self):
+        """Wait for a free slot, raising ServiceBusyError after the queue timeout"""
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise ServiceBusyError(f"All {self.queue_size} analysis slots are busy, please try again later")
+        with self.counter_lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self.counter_lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def run(self, method: str, *args):
+        """Run a DutchNLPService method in a worker once a slot is free"""
+        self.acquire()
+        try:
+            executor = self.executor
+            if executor is None:
+                return _run_in_worker(method, *args)
+            try:
+                return executor.submit(_run_in_worker, method, *args).result()
+            except BrokenProcessPool:
+                # a worker died, e.g. killed when running out of memory; replace the pool
+                # for the next requests, unless another request already did
+                logger.error("Analysis worker died, restarting the worker pool")
+                with self.counter_lock:
+                    if self.executor is executor:
+                        self.executor = self._create_executor()
+                raise
+        finally:
+            self.release()
+
+    def start(self):
+        """Start the workers up front, so that the first requests don't wait for the models to load"""
+        if self.executor is not None:
+            for future in [self.executor.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight
+        }
+
+analysis_pool = None
+analysis_pool_lock = threading.Lock()
+
+def get_analysis_pool() -> AnalysisPool:
+    """The pool of the web server process, created on first use so that workers don't create their own"""
+    global analysis_pool
+    with analysis_pool_lock:
+        if analysis_pool is None:
+            analysis_pool = AnalysisPool(analysis_workers, analysis_queue_size, analysis_queue_timeout)
+    return analysis_pool
+
+class TranscriptSession:
+    """
+    Running state of an incremental transcript analysis: how much of the transcript has been
+    analyzed, and the totals over the analyzed segments
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.lock = threading.Lock()  # analyses of one transcript run in the order they arrive
+        self.last_used = time.time()
+        self.segment_count = 0
+        self.text_length = 0
+        self.counts = {"characters": 0, "words": 0, "sentences": 0, "positive": 0, "negative": 0}
+        self.word_lemmas = set()
+        self.skill_counts = {}  # category -> skill -> number of segments mentioning it
+
+    def new_segments(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        The segments not analyzed yet: those with an "id" from the number already analyzed on,
+        as Whisper numbers them, or all of them when they have no ids
+        """
+        return [segment for segment in segments if segment.get("id", self.segment_count) >= self.segment_count]
+
+    def add(self, analysis: Dict[str, Any]):
+        """Add the result of DutchNLPService.analyze_segments to the totals"""
+        for segment in analysis["segments"]:
+            for skill in segment["skills"]:
+                category = self.skill_counts.setdefault(skill["category"], {})
+                category[skill["name"]] = category.get(skill["name"], 0) + 1
+        
+        for name, count in analysis["counts"].items():
+            self.counts[name] += count
+        self.word_lemmas.update(analysis["word_lemmas"])
+        self.segment_count += len(analysis["segments"])
+        self.text_length += analysis["counts"]["characters"]
+
+transcript_sessions = OrderedDict()
+transcript_sessions_lock = threading.Lock()
+
+def get_transcript_session(session_id: Optional[str]) -> Optional[TranscriptSession]:
+    """
+    The session with the given id, or a new one if the id is None, which is only kept once
+    it's passed to keep_transcript_session(); None if it doesn't exist (anymore). Idle sessions
+    expire, and the least recently used go once there are too many.
+    """
+    now = time.time()
+    with transcript_sessions_lock:
+        for expired in [key for key, session in transcript_sessions.items() if now - session.last_used > transcript_session_ttl]:
+            del transcript_sessions[expired]
+        
+        if session_id is None:
+            session = TranscriptSession()
+        else:
+            session = transcript_sessions.get(session_id)
+            if session is None:
+                return None
+            transcript_sessions.move_to_end(session_id)
+        
+        session.last_used = now
+        return session
+
+def keep_transcript_session(session: TranscriptSession):
+    """Keep a new session, once its first segments are analyzed, for the requests that follow"""
+    with transcript_sessions_lock:
+        transcript_sessions[session.id] = session
+        while len(transcript_sessions) > max_transcript_sessions:
+            transcript_sessions.popitem(last=False)
+
+def busy_response(error: ServiceBusyError):
+    response = jsonify({"success": False, "error": str(error)})
+    response.headers["Retry-After"] = str(int(analysis_queue_timeout))
+    return response, 503
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -465,19 +1285,15 @@ def health_check():
         "model": model_name,
         "model_loaded": nlp_service is not None,
         "pipeline": nlp_service.nlp.pipe_names if nlp_service else [],
+        "analysis_pool": get_analysis_pool().stats(),
+        "result_cache": nlp_service.result_cache.stats() if nlp_service else None,
+        "transcript_sessions": len(transcript_sessions),
         "timestamp": datetime.now().isoformat()
     })
 
 @app.route('/analyze', methods=['POST'])
 def analyze_text():
     """Analyze text using spaCy Dutch NLP"""
-    # Check if another analysis is in progress
-    if not processing_lock.acquire(blocking=False):
-        return jsonify({
-            "success": False,
-            "error": "Another analysis is currently in progress. Please wait and try again."
-        }), 429
-    
     try:
         if not nlp_service:
             return jsonify({"error": "NLP service not available"}), 503
@@ -494,21 +1310,71 @@ def analyze_text():
         logger.info(f"Analyzing text of length: {len(text)}")
         
         # Analyze text
-        result = nlp_service.analyze_text(text)
+        result = nlp_service.cached("analyze", text, lambda: get_analysis_pool().run("analyze_text", text))
         
         return jsonify({
             "success": True,
             "result": result
         })
         
+    except ServiceBusyError as e:
+        return busy_response(e)
     except Exception as e:
         logger.error(f"Text analysis endpoint error: {e}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
-    finally:
-        processing_lock.release()
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze a list of texts, streaming one NDJSON line per document as it completes"""
+    if not nlp_service:
+        return jsonify({"error": "NLP service not available"}), 503
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('documents'), list) or not data['documents']:
+        return jsonify({"error": "No documents provided"}), 400
+    if len(data['documents']) > max_batch_documents:
+        return jsonify({"error": f"Too many documents, at most {max_batch_documents} per batch"}), 400
+    
+    documents = []
+    for index, document in enumerate(data['documents']):
+        if isinstance(document, str):
+            document = {"text": document}
+        if not isinstance(document, dict) or not isinstance(document.get('text'), str):
+            return jsonify({"error": f"Document {index} has no text"}), 400
+        if not document['text'].strip():
+            return jsonify({"error": f"Document {index} has empty text"}), 400
+        documents.append({"id": document.get('id', index), "text": document['text']})
+    
+    try:
+        batch_size = int(data['batch_size']) if data.get('batch_size') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "batch_size must be an integer"}), 400
+    
+    # The batch runs nlp.pipe in this process, in a single process and a single slot: forking
+    # pipeline processes from a threaded server isn't safe, so there is no n_process option
+    pool = get_analysis_pool()
+    try:
+        pool.acquire()
+    except ServiceBusyError as e:
+        return busy_response(e)
+    
+    logger.info(f"Analyzing batch of {len(documents)} documents (batch_size={batch_size})")
+    
+    def generate():
+        try:
+            for result in nlp_service.analyze_batch(documents, batch_size=batch_size):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            logger.error(f"Batch analysis error: {e}")
+            yield json.dumps({"success": False, "error": str(e)}) + "\n"
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    # released when the response is closed, also when the client disconnects before streaming
+    response.call_on_close(pool.release)
+    return response
 
 @app.route('/skills', methods=['POST'])
 def extract_skills():
@@ -522,14 +1388,15 @@ def extract_skills():
             return jsonify({"error": "No text provided"}), 400
         
         text = data['text']
-        doc = nlp_service.nlp(text)
-        skills = nlp_service._extract_skills(doc, text)
+        result = nlp_service.cached("skills", text, lambda: get_analysis_pool().run("extract_skills", text))
         
         return jsonify({
             "success": True,
-            "skills": skills
+            **result
         })
         
+    except ServiceBusyError as e:
+        return busy_response(e)
     except Exception as e:
         logger.error(f"Skills extraction error: {e}")
         return jsonify({
@@ -537,6 +1404,76 @@ def extract_skills():
             "error": str(e)
         }), 500
 
+@app.route('/analyze/segments', methods=['POST'])
+def analyze_segments():
+    """
+    Analyze a transcript incrementally, as Whisper segments arrive: the first request starts a
+    session, later ones pass its "session_id" and only the segments appended since
+    """
+    try:
+        if not nlp_service:
+            return jsonify({"error": "NLP service not available"}), 503
+
+        data = request.get_json()
+        if not data or not isinstance(data.get('segments'), list):
+            return jsonify({"error": "No segments provided"}), 400
+
+        segments = data['segments']
+        for segment in segments:
+            if (not isinstance(segment, dict) or not isinstance(segment.get('text'), str)
+                    or not isinstance(segment.get('start'), (int, float))
+                    or not isinstance(segment.get('end'), (int, float))):
+                return jsonify({"error": "Each segment needs a text, a start and an end"}), 400
+
+        session = get_transcript_session(data.get('session_id'))
+        if session is None:
+            return jsonify({"error": "Unknown or expired session"}), 404
+
+        with session.lock:
+            new_segments = session.new_segments(segments)
+            analysis = get_analysis_pool().run("analyze_segments", new_segments, session.text_length)
+            session.add(analysis)
+            aggregates = nlp_service.summarize_transcript(session)
+        
+        # a new session is kept only now, so that a request turned away with a 503 doesn't
+        # leave an empty one behind, pushing out the sessions in use
+        if data.get('session_id') is None:
+            keep_transcript_session(session)
+
+        return jsonify({
+            "success": True,
+            "session_id": session.id,
+            "segments": analysis["segments"],
+            "aggregates": aggregates
+        })
+
+    except ServiceBusyError as e:
+        return busy_response(e)
+    except Exception as e:
+        logger.error(f"Segment analysis error: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/analyze/segments/<session_id>', methods=['DELETE'])
+def end_segment_analysis(session_id):
+    """End an incremental transcript analysis, returning its final totals"""
+    if not nlp_service:
+        return jsonify({"error": "NLP service not available"}), 503
+    
+    with transcript_sessions_lock:
+        session = transcript_sessions.pop(session_id, None)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+
+    with session.lock:
+        return jsonify({
+            "success": True,
+            "session_id": session.id,
+            "aggregates": nlp_service.summarize_transcript(session)
+        })
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"error": "Endpoint not found"}), 404
@@ -554,6 +1491,8 @@ if __name__ == '__main__':
     
     if nlp_service:
         logger.info(f"Pipeline: {nlp_service.nlp.pipe_names}")
+        logger.info(f"Starting {analysis_workers} analysis workers, queue size {analysis_queue_size}")
+        get_analysis_pool().start()
     else:
         logger.error("NLP service failed to initialize")
     
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the rule-based experience, education and sentiment extractors on a multi-page Dutch CV
+
+Compares the compiled rule set used by `DutchNLPService` with the per-call keyword lists and
+per-pattern regex searches it replaced. The lowercased lemmas and text come from the DocData
+the service shares between all its stages, so they're computed outside the measurement. Uses
+the same spaCy model as the service.
+
+Usage: python benchmark_rules.py [--pages 10] [--repeat 20]
+"""
+
+import argparse
+import re
+
+from app import DocData, nlp_service
+from benchmark_skills import measure
+from sample_cv import CV_PAGE
+
+
+def previous_rules(doc, text: str):
+    """The previous implementation: every extractor rebuilds its rules and scans on its own"""
+    positive_words = ["goed", "uitstekend", "succesvol", "positief", "sterk", "ervaren", "expert"]
+    negative_words = ["slecht", "zwak", "probleem", "moeilijk", "beperkt"]
+    positive_count = 0
+    negative_count = 0
+    for token in doc:
+        if token.lemma_.lower() in positive_words:
+            positive_count += 1
+        elif token.lemma_.lower() in negative_words:
+            negative_count += 1
+
+    experience = []
+    year_patterns = [
+        r'(\d+)\s*jaar\s*(ervaring|gewerkt)',
+        r'(\d+)\s*jaren\s*(ervaring|gewerkt)',
+        r'sinds\s*(\d{4})',
+        r'(\d{4})\s*-\s*(\d{4}|\w+)'
+    ]
+    for pattern in year_patterns:
+        for match in re.finditer(pattern, text.lower()):
+            experience.append((match.start(), match.end(), match.group(0)))
+
+    education_keywords = [
+        "universiteit", "hogeschool", "bachelor", "master", "diploma", "certificaat",
+        "opleiding", "studie", "afgestudeerd", "doctoraal", "phd", "mbo", "hbo", "wo"
+    ]
+    education = [token.i for token in doc if token.lemma_.lower() in education_keywords]
+
+    return positive_count, negative_count, experience, education
+
+
+def compiled_rules(data: DocData):
+    """The rule set: one lemma lookup pass and one combined regex scan"""
+    lemma_matches = nlp_service.rules.match_lemmas(data.lemmas)
+    experience = nlp_service.rules.find_experience(data.text_lower)
+    return (
+        len(lemma_matches["positive"]),
+        len(lemma_matches["negative"]),
+        experience,
+        lemma_matches["education"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    text = CV_PAGE * args.pages
+    doc = nlp_service.nlp(text)
+    print(f"{args.pages} pages: {len(text)} characters, {len(doc)} tokens")
+
+    previous_ms, previous = measure(previous_rules, doc, text, repeat=args.repeat)
+    compiled_ms, compiled = measure(compiled_rules, DocData(doc, text), repeat=args.repeat)
+
+    assert previous == compiled, "both implementations should find the same matches"
+    print(f"experience, education and sentiment rules, per-call lists and patterns: {previous_ms:.1f} ms")
+    print(f"experience, education and sentiment rules, compiled rule set: {compiled_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for serving the spaCy Dutch NLP service in production
+
+Usage (from the spacy-nlp-service directory): gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden with the environment variables below. Gunicorn doesn't run
+on Windows; use `python app.py` there, or run the service in WSL or a container.
+"""
+
+import os
+
+wsgi_app = "app:app"
+bind = f"0.0.0.0:{os.getenv('PORT', 5001)}"
+
+# A single web process: the analyses run in its pool of NLP_WORKERS processes, which is what
+# uses the cores, while the result cache and the incremental transcript sessions live in the
+# web process and would be split between several of them
+workers = int(os.getenv('WEB_WORKERS', 1))
+
+# The request threads mostly wait for an analysis slot or stream batch results; more threads
+# than NLP_QUEUE_SIZE keep health checks and cache hits answered while the queue is full.
+# Like the process counts, this is an untuned default rather than a measured optimum.
+worker_class = "gthread"
+threads = int(os.getenv('WEB_THREADS', 32))
+
+# A gthread worker is only restarted when its main loop stalls, not for long requests, so
+# this mainly bounds how long a stuck worker goes unnoticed
+timeout = int(os.getenv('WEB_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 60))
+keepalive = 5
+
+# The spaCy model of the web process loads once, before forking. The analysis pool must not
+# exist yet at that point: its processes and threads don't survive a fork, so each worker
+# creates its own pool once forked.
+preload_app = os.getenv('WEB_PRELOAD', 'true').lower() == 'true'
+
+
+def post_worker_init(worker):
+    import app
+
+    if app.nlp_service:
+        # start the analysis processes up front, so that the first requests don't wait for
+        # their models to load
+        app.get_analysis_pool().start()
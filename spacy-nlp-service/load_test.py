@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Load test a running spaCy NLP service with concurrent /analyze requests
+
+Every request sends a different CV, also across runs, so that the result cache doesn't answer
+them. Reports the throughput, the latency percentiles and the requests turned away as busy.
+
+Usage: python load_test.py [--url http://localhost:5001] [--concurrency 8] [--requests 200] [--pages 2]
+"""
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from sample_cv import CV_PAGE
+
+
+def post(url: str, text: str):
+    """Post one text, returning the status and the latency in seconds"""
+    body = json.dumps({"text": text}).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError:
+        status = None
+    return status, time.perf_counter() - start
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:5001")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args()
+
+    url = f"{args.url}/analyze"
+    run = int(time.time())
+    texts = [CV_PAGE * args.pages + f"\nReferentienummer {run}-{i}.\n" for i in range(args.requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda text: post(url, text), texts))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for status, latency in results if status == 200]
+    busy = sum(1 for status, _ in results if status == 503)
+    failed = len(results) - len(latencies) - busy
+
+    print(f"{args.requests} requests of {len(texts[0])} characters, {args.concurrency} concurrent")
+    print(f"throughput: {len(latencies) / elapsed:.1f} requests/s over {elapsed:.1f} s")
+    if latencies:
+        print(f"latency: p50 {percentile(latencies, 0.5) * 1000:.0f} ms, p95 {percentile(latencies, 0.95) * 1000:.0f} ms")
+    print(f"busy (503): {busy}, failed: {failed}")
+
+
+if __name__ == '__main__':
+    main()
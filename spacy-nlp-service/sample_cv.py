@@ -0,0 +1,29 @@
+"""A page of a Dutch CV, used by the benchmarks and the load test"""
+
+CV_PAGE = """
+Werkervaring
+
+2019 - heden: Senior Software Engineer bij Voorbeeld B.V. in Utrecht.
+Ik heb 5 jaar ervaring met Python, Django en PostgreSQL en heb een platform gebouwd
+voor klantgerichte data-analyse. Verantwoordelijk voor de ontwikkeling van REST API's
+in Flask en FastAPI, de implementatie van CI/CD pipelines met GitLab, Docker en
+Kubernetes, en het beheer van onze omgevingen op AWS en Azure.
+
+2015 - 2019: Full-stack developer bij Webbureau Noord in Groningen.
+Project: een webshop gemaakt met React, TypeScript, Node.js en MongoDB. Daarnaast
+gewerkt met Vue, Angular, jQuery, Bootstrap en Tailwind, en met Redis en Elasticsearch
+voor zoekfunctionaliteit. Agile werken in Scrum teams met Jira en Confluence.
+
+Opleiding
+
+Master Informatica, Universiteit Utrecht. Bachelor Technische Informatica, Hogeschool
+Utrecht. Certificaat AWS Solutions Architect.
+
+Vaardigheden
+
+Programmeertalen: Python, Java, C#, C++, Go, Rust, Kotlin, SQL, HTML en CSS.
+Tools: Git, GitHub, Terraform, Ansible, Jenkins, Postman, VS Code en IntelliJ.
+Talen: Nederlands, Engels, Duits en Frans.
+Competenties: communicatie, teamwork, leiderschap, probleemoplossing, analytisch,
+zelfstandig, resultaatgericht en innovatief. Expert in design thinking en user experience.
+"""
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+import spacy
+from spacy.language import Language
+
+# analyses run in the test process; the pool's spawned workers would load the full model
+os.environ.setdefault("NLP_WORKERS", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+@Language.component("lowercase_lemmas")
+def lowercase_lemmas(doc):
+    # stands in for the lemmatizer, which a blank pipeline doesn't have
+    for token in doc:
+        token.lemma_ = token.lower_
+    return doc
+
+
+@pytest.fixture(scope="session")
+def blank_model(tmp_path_factory):
+    """A blank Dutch pipeline with sentence boundaries and lemmas, saved like a model package"""
+    nlp = spacy.blank("nl")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("lowercase_lemmas")
+    path = tmp_path_factory.mktemp("nl_blank")
+    nlp.to_disk(path)
+    return str(path)
+
+
+@pytest.fixture
+def service(blank_model, monkeypatch):
+    """The NLP service on the blank pipeline, with an in-memory result cache only"""
+    monkeypatch.setattr(app, "result_cache_dir", None)
+    monkeypatch.setattr(app, "doc_cache_dir", None)
+    return app.DutchNLPService(blank_model)
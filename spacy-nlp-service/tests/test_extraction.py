@@ -0,0 +1,158 @@
+import pytest
+from spacy.language import Language
+
+import app
+from app import CHUNK_BOUNDARIES, EXTRACTION_RULES, RuleSet, build_skill_index, split_text
+
+
+parsed_lengths = []
+
+
+@Language.component("record_length")
+def record_length(doc):
+    parsed_lengths.append(len(doc.text))
+    return doc
+
+
+def without_timings(result):
+    processing_info = dict(result["processing_info"], timestamp=None, timings_ms=None)
+    return dict(result, processing_info=processing_info)
+
+
+def skill_hits(service, text):
+    doc = service.nlp(text)
+    return {
+        (category, skill["name"], skill["start"], skill["end"])
+        for category, skills in service._extract_skills(doc, text).items()
+        for skill in skills
+    }
+
+
+def test_split_text_prefers_paragraphs_then_sentences():
+    text = "Eerste alinea met tekst.\n\nTweede alinea. Nog een zin hier en daar"
+    chunks = split_text(text, 40)
+    assert "".join(chunks) == text
+    assert chunks[0] == "Eerste alinea met tekst.\n\n"
+    assert all(len(chunk) <= 40 for chunk in chunks)
+
+    text = "Een zin met woorden. Nog een zin die lang is zonder punt"
+    assert split_text(text, 30)[0] == "Een zin met woorden. "
+
+    # a boundary in the first half would make tiny chunks; the last whitespace is used instead
+    text = "Een zin. Nog een zin die lang is zonder punt erin"
+    assert split_text(text, 30)[0] == "Een zin. Nog een zin die lang "
+
+
+def test_split_text_falls_back_to_whitespace_and_hard_cuts():
+    text = "woord " * 20
+    chunks = split_text(text, 16)
+    assert "".join(chunks) == text
+    assert all(chunk.endswith(" ") for chunk in chunks[:-1])
+
+    text = "x" * 50
+    assert split_text(text, 16) == ["x" * 16, "x" * 16, "x" * 16, "xx"]
+    assert split_text("kort", 16) == ["kort"]
+
+
+def test_chunk_boundaries_match_the_last_boundary():
+    paragraph, sentence, whitespace = CHUNK_BOUNDARIES
+    assert paragraph.match("a\n\nb\n \nc").end() == 7
+    assert sentence.match("a. b! c").end() == 6
+    assert whitespace.match("a b c").end() == 4
+
+
+@pytest.fixture
+def chunked(service, monkeypatch):
+    """The service parsing in chunks of at most 100 characters, recording the parsed lengths"""
+    monkeypatch.setattr(app, "max_chunk_characters", 100)
+    service.nlp.add_pipe("record_length")
+    parsed_lengths.clear()
+    return service
+
+
+def test_analyze_text_in_chunks(blank_model, chunked):
+    text = "Ik heb 5 jaar ervaring met Python en Docker. Afgestudeerd aan het hbo, goed!\n\n" * 20
+    expected = app.DutchNLPService(blank_model).analyze_text(text)
+
+    result = chunked.analyze_text(text)
+    assert len(parsed_lengths) > 1
+    assert max(parsed_lengths) <= 100
+    assert sum(parsed_lengths) == len(text)
+
+    # the hits of each chunk are at their offsets in the whole text
+    assert without_timings(result) == without_timings(expected)
+    assert result["education"][-1]["start"] == text.rindex("hbo")
+    assert {skill["name"] for skill in chunked.extract_skills(text)["skills"]["tools"]} == {"docker"}
+
+
+def test_analyze_batch_in_chunks(blank_model, chunked, tmp_path):
+    documents = [
+        {"id": 1, "text": "Sinds 2019 bij Acme, met Python. " * 10},
+        {"id": 2, "text": "Ervaring met React."},
+        {"id": 3, "text": "Ik werk met Go en Rust. " * 12},
+    ]
+    expected = app.DutchNLPService(blank_model)
+    chunked.doc_cache = app.DocCache(str(tmp_path))
+
+    results = list(chunked.analyze_batch(documents))
+    assert [result["id"] for result in results] == [1, 2, 3]
+    assert max(parsed_lengths) <= 100
+    for document, result in zip(documents, results):
+        assert without_timings(result["result"]) == without_timings(expected.analyze_text(document["text"]))
+
+    # a changed extractor reruns on the stored chunk parses
+    parsed_lengths.clear()
+    chunked.result_cache = app.ResultCache(1)
+    assert [result["success"] for result in chunked.analyze_batch(documents)] == [True] * 3
+    assert parsed_lengths == []
+
+
+def test_find_experience_matches_separate_scans():
+    text = "5 jaar ervaring, 10 jaren gewerkt, sinds 2019 - heden en 2015-2018 bij acme"
+    expected = [
+        (match.start(), match.end(), match.group(0))
+        for pattern in EXTRACTION_RULES.experience_patterns
+        for match in pattern.finditer(text)
+    ]
+    assert EXTRACTION_RULES.find_experience(text) == expected
+    assert [hit[2] for hit in expected] == [
+        "5 jaar ervaring",
+        "10 jaren gewerkt",
+        "sinds 2019",
+        "2019 - heden",
+        "2015-2018",
+    ]
+
+
+def test_match_lemmas():
+    lemmas = ["ik", "ben", "sterk", "in", "probleem", "na", "mijn", "hbo", "goed"]
+    assert EXTRACTION_RULES.match_lemmas(lemmas) == {
+        "positive": [2, 8],
+        "negative": [4],
+        "education": [7],
+    }
+
+
+def test_rule_set_rejects_words_in_two_lexicons():
+    with pytest.raises(ValueError, match="both"):
+        RuleSet([r"\d+"], r"\d", {"a": frozenset(["goed"]), "b": frozenset(["goed"])})
+
+
+def test_skill_index_keys_on_the_first_word():
+    index = build_skill_index({"tools": ["c++", "node.js", "ci/cd", "vs code"]})
+    assert sorted(index) == ["c", "ci", "node", "vs"]
+
+    with pytest.raises(ValueError):
+        build_skill_index({"tools": [".net"]})
+
+
+def test_extract_multi_token_skills(service):
+    text = "Ervaring met C++, Node.js en CI/CD in VS Code; geen Javascript-kennis."
+    assert skill_hits(service, text) == {
+        ("programming_languages", "c++", 13, 16),
+        ("programming_languages", "c", 13, 14),
+        ("frameworks", "node.js", 18, 25),
+        ("methodologies", "ci/cd", 29, 34),
+        ("tools", "vs code", 38, 45),
+        ("programming_languages", "javascript", 52, 62),
+    }
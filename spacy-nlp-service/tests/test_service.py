@@ -0,0 +1,133 @@
+import pytest
+
+import app
+from app import AnalysisPool, ResultCache, ServiceBusyError
+
+
+@pytest.fixture
+def client(service, monkeypatch):
+    monkeypatch.setattr(app, "nlp_service", service)
+    monkeypatch.setattr(app, "analysis_pool", AnalysisPool(0, queue_size=1, queue_timeout=0.05))
+    return app.app.test_client()
+
+
+def test_result_cache_evicts_the_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}
+    cache.put("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert list(cache.entries) == ["a", "c"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_result_cache_persists_to_disk(tmp_path):
+    ResultCache(max_entries=2, cache_dir=str(tmp_path)).put("a", {"n": 1})
+    assert [path.name for path in tmp_path.iterdir()] == ["a.json"]
+
+    cache = ResultCache(max_entries=2, cache_dir=str(tmp_path))
+    assert cache.get("a") == {"n": 1}
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("a") == {"n": 1}
+    assert cache.stats()["disk_hits"] == 1  # now held in memory
+
+    (tmp_path / "b.json").write_text("{not json")
+    assert cache.get("b") is None
+
+
+def test_cached_computes_once_per_text_and_analysis(service):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"skills": {}}
+
+    assert service.cached("skills", "Python", compute) == {"skills": {}}
+    service.cached("skills", "Python", compute)
+    service.cached("skills", "Python ", compute)
+    service.cached("analyze", "Python", compute)
+    assert len(calls) == 3
+
+
+def test_analysis_pool_turns_requests_away_when_full():
+    pool = AnalysisPool(0, queue_size=1, queue_timeout=0.05)
+    pool.acquire()
+    with pytest.raises(ServiceBusyError):
+        pool.acquire()
+    assert pool.stats()["in_flight"] == 1
+
+    pool.release()
+    pool.acquire()
+    pool.release()
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_busy_service_answers_503(client):
+    app.analysis_pool.acquire()
+    try:
+        response = client.post("/skills", json={"text": "Ik ken Python"})
+    finally:
+        app.analysis_pool.release()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(int(app.analysis_queue_timeout))
+    assert response.get_json()["success"] is False
+
+    response = client.post("/skills", json={"text": "Ik ken Python"})
+    assert response.status_code == 200
+    assert response.get_json()["skills"]["programming_languages"][0]["name"] == "python"
+
+
+def test_batch_rejects_empty_texts(client):
+    response = client.post("/analyze/batch", json={"documents": ["Ik ken Python", "  "]})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Document 1 has empty text"
+    assert app.analysis_pool.stats()["in_flight"] == 0
+
+
+def test_cache_hits_are_marked_and_drop_the_stage_timings(service, client):
+    def compute():
+        return {"processing_info": {"timestamp": "2020-01-01T00:00:00", "timings_ms": {"pipeline": 1.0}}}
+
+    first = service.cached("analyze", "Python", compute)["processing_info"]
+    second = service.cached("analyze", "Python", compute)["processing_info"]
+    assert "cache" not in first and "timings_ms" in first
+    assert second["cache"] == "hit" and "timings_ms" not in second
+    assert second["timestamp"] > first["timestamp"]
+    assert "timings_ms" in service.result_cache.get(service.cache_key("Python"))["processing_info"]
+
+    client.post("/skills", json={"text": "Ik ken Python"})
+    skills = client.post("/skills", json={"text": "Ik ken Python"}).get_json()
+    assert skills["cache"] == "hit" and "timings_ms" not in skills
+
+
+def test_ending_a_session_without_a_model_answers_503(client, monkeypatch):
+    session = app.TranscriptSession()
+    app.transcript_sessions[session.id] = session
+    monkeypatch.setattr(app, "nlp_service", None)
+    try:
+        response = client.delete(f"/analyze/segments/{session.id}")
+    finally:
+        app.transcript_sessions.pop(session.id, None)
+
+    assert response.status_code == 503
+    assert response.get_json()["error"] == "NLP service not available"
+
+
+def test_busy_service_keeps_no_new_session(client, monkeypatch):
+    monkeypatch.setattr(app, "transcript_sessions", app.OrderedDict())
+    segments = [{"start": 0.0, "end": 1.0, "text": " Ik ken Python."}]
+
+    app.analysis_pool.acquire()
+    try:
+        response = client.post("/analyze/segments", json={"segments": segments})
+    finally:
+        app.analysis_pool.release()
+    assert response.status_code == 503
+    assert len(app.transcript_sessions) == 0
+
+    response = client.post("/analyze/segments", json={"segments": segments})
+    assert response.status_code == 200
+    assert list(app.transcript_sessions) == [response.get_json()["session_id"]]
@@ -0,0 +1,94 @@
+import app
+from app import SegmentTimeline, TranscriptSession, get_transcript_session, keep_transcript_session
+
+SEGMENTS = [
+    {
+        "id": 0,
+        "start": 0.0,
+        "end": 2.0,
+        "text": " Ik ken Python goed.",
+        "words": [
+            {"word": " Ik", "start": 0.0, "end": 0.3},
+            {"word": " ken", "start": 0.3, "end": 0.6},
+            {"word": " Python", "start": 0.6, "end": 1.2},
+            {"word": " goed.", "start": 1.2, "end": 2.0},
+        ],
+    },
+    {"id": 1, "start": 2.0, "end": 4.0, "text": " Sinds 2019 op de hbo."},
+]
+
+
+def test_segment_timeline_maps_characters_to_words():
+    timeline = SegmentTimeline(SEGMENTS[0])
+    assert timeline.span(8, 14) == (0.6, 1.2)  # "Python"
+    assert timeline.span(4, 14) == (0.3, 1.2)  # "ken Python"
+    assert timeline.span(0, 20) == (0.0, 2.0)
+
+    # words that don't add up to the text are ignored
+    edited = dict(SEGMENTS[0], text=" Ik ken Java goed.")
+    assert SegmentTimeline(edited).span(8, 12) == (0.0, 2.0)
+    assert SegmentTimeline(SEGMENTS[1]).span(1, 11) == (2.0, 4.0)
+
+
+def test_analyze_segments_places_hits_in_the_transcript(service):
+    analysis = service.analyze_segments(SEGMENTS, offset=100)
+    first, second = analysis["segments"]
+
+    (skill,) = first["skills"]
+    assert (skill["name"], skill["category"]) == ("python", "programming_languages")
+    assert (skill["start"], skill["end"]) == (108, 114)
+    assert (skill["audio_start"], skill["audio_end"]) == (0.6, 1.2)
+
+    # the second segment starts after the 20 characters of the first
+    (experience,) = second["experience"]
+    assert (experience["text"], experience["start"], experience["end"]) == ("sinds 2019", 121, 131)
+    assert (experience["audio_start"], experience["audio_end"]) == (2.0, 4.0)
+    (education,) = second["education"]
+    assert (education["text"], education["start"]) == ("hbo", 138)
+
+    assert analysis["counts"] == {
+        "characters": 42,
+        "words": 8,
+        "sentences": 2,
+        "positive": 1,
+        "negative": 0,
+    }
+
+
+def test_session_aggregates_over_requests(service):
+    session = TranscriptSession()
+    session.add(service.analyze_segments(SEGMENTS[:1], session.text_length))
+
+    # Whisper resends the segments it already emitted; only the new one is analyzed
+    resent = SEGMENTS + [{"id": 2, "start": 4.0, "end": 5.0, "text": " Python is sterk."}]
+    new_segments = session.new_segments(resent)
+    assert [segment["id"] for segment in new_segments] == [1, 2]
+
+    analysis = service.analyze_segments(new_segments, session.text_length)
+    assert analysis["segments"][1]["skills"][0]["start"] == 43
+    session.add(analysis)
+
+    summary = service.summarize_transcript(session)
+    assert summary["segments"] == 3
+    assert summary["skills"] == {"programming_languages": {"python": 2}}
+    assert summary["sentiment"]["positive_indicators"] == 2
+    assert summary["statistics"]["character_count"] == 59
+    assert summary["statistics"]["sentence_count"] == 3
+
+
+def test_transcript_sessions_expire_and_are_bounded(monkeypatch):
+    monkeypatch.setattr(app, "transcript_sessions", app.OrderedDict())
+    monkeypatch.setattr(app, "max_transcript_sessions", 2)
+
+    first = get_transcript_session(None)
+    assert get_transcript_session(first.id) is None  # not kept until it's analyzed
+    keep_transcript_session(first)
+    second = get_transcript_session(None)
+    keep_transcript_session(second)
+    assert get_transcript_session(first.id) is first  # now the most recently used
+    keep_transcript_session(get_transcript_session(None))
+    assert get_transcript_session(second.id) is None
+    assert get_transcript_session(first.id) is first
+
+    first.last_used -= app.transcript_session_ttl + 1
+    assert get_transcript_session(first.id) is None
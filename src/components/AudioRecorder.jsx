@@ -4,6 +4,7 @@ import {
   Volume2, Clock, Zap, CheckCircle, AlertTriangle, Loader, XCircle
 } from 'lucide-react';
 import { AudioRecorder, whisperService, blobToFile, formatTranscriptionResult } from '../utils/whisperService';
+import { formatSpacyResult } from '../utils/spacyService';
 
 const AudioRecorderComponent = ({ onTranscriptionComplete, onAudioUpload }) => {
   const [isRecording, setIsRecording] = useState(false);
@@ -68,17 +69,6 @@ const AudioRecorderComponent = ({ onTranscriptionComplete, onAudioUpload }) => {
       // Automatically transcribe if Whisper is available
       if (whisperAvailable) {
         await transcribeAudio(blob);
-      } else {
-        // Transcribe audio using Whisper service
-        const result = await whisperService.transcribeAudio(audioFile, {
-          language: 'nl', // Assuming Dutch for now
-          task: 'transcribe',
-          wordTimestamps: true
-        });
-        setTranscriptionResult(result);
-        if (onTranscriptionComplete) {
-          onTranscriptionComplete(result);
-        }
       }
     } catch (error) {
       setError('Kon opname niet stoppen.');
@@ -107,6 +97,24 @@ const AudioRecorderComponent = ({ onTranscriptionComplete, onAudioUpload }) => {
     }
   };
 
+  // Transcribes the file and has the Whisper service analyze the transcript with spaCy:
+  // the transcript is shown as soon as it arrives, the analysis is passed on after it
+  const transcribeAndAnalyze = async (audioFile, options) => {
+    const { transcription, analysis } = await whisperService.transcribeAndAnalyze(audioFile, {
+      language: 'nl',
+      task: 'transcribe',
+      wordTimestamps: true,
+      ...options
+    }, (result) => setTranscriptionResult(formatTranscriptionResult(result)));
+
+    const formattedResult = formatTranscriptionResult(transcription);
+    setTranscriptionResult(formattedResult);
+
+    if (onTranscriptionComplete) {
+      onTranscriptionComplete(formattedResult, formatSpacyResult(analysis));
+    }
+  };
+
   const transcribeAudio = async (blob) => {
     try {
       setIsTranscribing(true);
@@ -118,19 +126,9 @@ const AudioRecorderComponent = ({ onTranscriptionComplete, onAudioUpload }) => {
         throw new Error('Whisper service is not available. Please ensure the Whisper service is running on port 5000.');
       }
 
-      const result = await whisperService.transcribeAudio(audioFile, {
-        language: 'nl',
-        task: 'transcribe',
-        wordTimestamps: true,
+      await transcribeAndAnalyze(audioFile, {
         initialPrompt: 'Dit is een sollicitatiegesprek in het Nederlands.'
       });
-
-      const formattedResult = formatTranscriptionResult(result);
-      setTranscriptionResult(formattedResult);
-
-      if (onTranscriptionComplete) {
-        onTranscriptionComplete(formattedResult);
-      }
     } catch (error) {
       setError('Transcriptie mislukt. Probeer opnieuw.');
       console.error('Transcription error:', error);
@@ -160,18 +158,7 @@ const AudioRecorderComponent = ({ onTranscriptionComplete, onAudioUpload }) => {
         throw new Error('Whisper service is not available. Please ensure the Whisper service is running on port 5000.');
       }
 
-      const result = await whisperService.transcribeAudio(file, {
-        language: 'nl',
-        task: 'transcribe',
-        wordTimestamps: true
-      });
-
-      const formattedResult = formatTranscriptionResult(result);
-      setTranscriptionResult(formattedResult);
-
-      if (onTranscriptionComplete) {
-        onTranscriptionComplete(formattedResult);
-      }
+      await transcribeAndAnalyze(file);
     } catch (error) {
       setError('Bestand upload mislukt.');
       console.error('File upload error:', error);
@@ -102,12 +102,14 @@ export const processCVText = async (file) => {
 
 
 /**
- * Process audio file using Whisper speech-to-text
+ * Process audio file using Whisper speech-to-text, with the spaCy analysis of the
+ * transcript that the Whisper service streams back after it
  * @param {File} audioFile - Audio file to transcribe
  * @param {Object} options - Transcription options
- * @returns {Promise<Object>} - Transcription result
+ * @param {Function} onTranscript - Called with the formatted transcription before the analysis arrives
+ * @returns {Promise<Object>} - Transcription and transcript analysis result
  */
-export const processAudioWithWhisper = async (audioFile, options = {}) => {
+export const processAudioWithWhisper = async (audioFile, options = {}, onTranscript = null) => {
   try {
     console.log('Processing audio file with Whisper:', audioFile.name);
 
@@ -120,21 +122,22 @@ export const processAudioWithWhisper = async (audioFile, options = {}) => {
 
     console.log('Using Whisper service for transcription');
 
-    // Use real Whisper transcription
-    const transcriptionResult = await whisperService.transcribeAudio(audioFile, {
+    // Use real Whisper transcription; the service analyzes the transcript with spaCy itself
+    const { transcription, analysis, analysisError } = await whisperService.transcribeAndAnalyze(audioFile, {
       language: 'nl',
       task: 'transcribe',
       wordTimestamps: true,
       initialPrompt: 'Dit is een sollicitatiegesprek in het Nederlands.',
       ...options
-    });
+    }, onTranscript && ((result) => onTranscript(formatTranscriptionResult(result))));
 
-    const formattedResult = formatTranscriptionResult(transcriptionResult);
+    const formattedResult = formatTranscriptionResult(transcription);
 
     return {
       success: true,
       audioTranscript: formattedResult.text,
       transcriptionData: formattedResult,
+      transcriptAnalysis: spacyService.formatAnalysisResult(analysis),
       metadata: {
         fileName: audioFile.name,
         fileSize: audioFile.size,
@@ -144,7 +147,8 @@ export const processAudioWithWhisper = async (audioFile, options = {}) => {
         duration: formattedResult.duration,
         wordCount: formattedResult.wordCount,
         processingTime: new Date().toISOString(),
-        isRealTranscription: true
+        isRealTranscription: true,
+        transcriptAnalysisError: analysisError
       }
     };
   } catch (error) {
@@ -155,6 +159,37 @@ export const processAudioWithWhisper = async (audioFile, options = {}) => {
 
 
 
+/**
+ * Analyze the communication in an interview transcript, taking the key phrases from
+ * the spaCy analysis that came with the transcription
+ * @param {string} transcript - Interview transcript
+ * @param {Object} audioResult - Result of processAudioWithWhisper
+ * @returns {Object} - Communication analysis
+ */
+const analyzeAudioCommunication = (transcript, audioResult) => {
+  const quality = analyzeCommunicationQuality(transcript, audioResult.metadata);
+  const personality = extractPersonalityTraits(transcript);
+  const keyPhrases = audioResult.transcriptAnalysis?.keyPhrases || [];
+
+  return {
+    clarity: quality.clarity,
+    confidence: quality.confidence,
+    fluency: quality.fluency,
+    technicalCommunication: quality.technicalCommunication,
+    overallCommunicationScore: quality.overallScore,
+    personalityTraits: personality.traits,
+    leadershipSkills: analyzeLeadershipSkills(transcript),
+    communicationInsights: [...quality.insights, ...personality.insights],
+    keyPoints: keyPhrases.map(phrase => phrase.text),
+    isRealTranscription: true,
+    transcriptionMethod: audioResult.metadata.transcriptionMethod,
+    analysisMetadata: {
+      enhancedAnalysis: Boolean(audioResult.transcriptAnalysis),
+      sentiment: audioResult.transcriptAnalysis?.sentiment || null
+    }
+  };
+};
+
 export const analyzeCandidate = async (cvText, audioTranscript, desiredSkills, audioResult) => {
   try {
     // Extract skills using consolidated enhanced method
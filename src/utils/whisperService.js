@@ -124,6 +124,76 @@ export class WhisperService {
     }
   }
 
+  /**
+   * Transcribe audio file and analyze the transcript with spaCy in one request:
+   * the Whisper service hands the transcript to the spaCy service itself and
+   * streams both results back as NDJSON
+   * @param {File} audioFile - Audio file to transcribe
+   * @param {Object} options - Transcription options, as for transcribeAudio
+   * @param {Function} onTranscript - Called with the transcription as soon as it's done
+   * @returns {Promise<Object>} - Transcription and spaCy analysis (null if it failed)
+   */
+  async transcribeAndAnalyze(audioFile, options = {}, onTranscript = null) {
+    const {
+      language = 'nl',
+      task = 'transcribe',
+      wordTimestamps = true,
+      initialPrompt = null
+    } = options;
+
+    const formData = new FormData();
+    formData.append('audio', audioFile);
+    formData.append('language', language);
+    formData.append('task', task);
+    formData.append('word_timestamps', wordTimestamps.toString());
+
+    if (initialPrompt) {
+      formData.append('initial_prompt', initialPrompt);
+    }
+
+    const response = await fetch(`${this.baseUrl}/transcribe-analyze`, {
+      method: 'POST',
+      body: formData,
+    });
+
+    if (!response.ok) {
+      const result = await response.json();
+      throw new Error(result.error || 'Transcription failed');
+    }
+
+    const results = { transcription: null, analysis: null, analysisError: null };
+    const handleLine = (line) => {
+      if (!line.trim()) return;
+
+      const message = JSON.parse(line);
+      if (message.type === 'transcript') {
+        results.transcription = message.result;
+        if (onTranscript) onTranscript(message.result);
+      } else if (message.success) {
+        results.analysis = message.result;
+      } else {
+        console.warn('Transcript analysis failed:', message.error);
+        results.analysisError = message.error;
+      }
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+
+    return results;
+  }
+
   /**
    * Detect language of audio file
    * @param {File} audioFile - Audio file to analyze
@@ -0,0 +1,115 @@
+"""
+Benchmarks for the word-level timing kernels in `whisper.timing`
+
+    PYTHONPATH=. python benchmarks/benchmark_timing.py --threads 8
+
+run from the repository root, or with whisper installed, on the machine that will run the
+model. The DTW table ends with the diagonal length, min(tokens, frames), from which the parallel
+kernel was faster, to set as WHISPER_DTW_PARALLEL_MIN_DIAGONAL.
+"""
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+import numba
+import numpy as np
+import torch
+
+from whisper.timing import (
+    dtw_band_radius,
+    dtw_cpu,
+    dtw_cpu_banded,
+    dtw_cpu_parallel,
+    median_filter_cpu,
+)
+
+# (text tokens, audio frames); 1500 frames is a full 30-second window, whose few dozen tokens
+# make for short diagonals however many frames there are
+DTW_SIZES = [
+    (16, 100),
+    (32, 1500),
+    (64, 500),
+    (128, 1000),
+    (200, 1500),
+    (448, 1500),
+    (1024, 3000),
+    (2048, 6000),
+]
+
+# (alignment heads, text tokens, audio frames) of the attention weights, which are
+# filtered over the frames after being cut to the segment, i.e. at most 750 frames
+MEDIAN_FILTER_SIZES = [
+    (6, 64, 250),
+    (6, 200, 750),
+    (20, 448, 750),
+]
+
+
+def measure(fn: Callable, *args, repeat: int) -> float:
+    fn(*args)  # compile and warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def benchmark_dtw(sizes: List[Tuple[int, int]], repeat: int, band: float):
+    print(f"DTW, {numba.get_num_threads()} numba threads (milliseconds per call)")
+    print(f"{'tokens':>8} {'frames':>8} {'serial':>10} {'parallel':>10} {'banded':>10}")
+    faster = {}  # whether the parallel kernel was faster, by diagonal length
+    for n_tokens, n_frames in sizes:
+        x = np.random.randn(n_tokens, n_frames)
+        radius = dtw_band_radius(n_tokens, n_frames, band)
+        serial = measure(dtw_cpu, x, repeat=repeat)
+        parallel = measure(dtw_cpu_parallel, x, repeat=repeat)
+        banded = measure(dtw_cpu_banded, x, radius, repeat=repeat)
+        print(
+            f"{n_tokens:>8} {n_frames:>8} {serial:>10.3f} {parallel:>10.3f} {banded:>10.3f}"
+        )
+        diagonal = min(n_tokens, n_frames)
+        faster[diagonal] = faster.get(diagonal, True) and parallel < serial
+
+    parallel_min_diagonal = None
+    for diagonal in sorted(faster):
+        if not faster[diagonal]:
+            parallel_min_diagonal = None
+        elif parallel_min_diagonal is None:
+            parallel_min_diagonal = diagonal
+
+    if numba.get_num_threads() < 2 or parallel_min_diagonal is None:
+        print("the parallel kernel wasn't faster from any size on; keep it off")
+    else:
+        print(
+            f"the parallel kernel was faster from diagonals of {parallel_min_diagonal} on"
+        )
+
+
+def benchmark_median_filter(sizes: List[Tuple[int, int, int]], repeat: int, width: int):
+    print(f"median filter of width {width} (milliseconds per call)")
+    print(f"{'heads':>8} {'tokens':>8} {'frames':>8} {'sort':>10} {'kernel':>10}")
+    for n_heads, n_tokens, n_frames in sizes:
+        x = torch.randn(n_heads, n_tokens, n_frames + width - 1)
+        sort = measure(
+            lambda x: x.unfold(-1, width, 1).sort()[0][..., width // 2],
+            x,
+            repeat=repeat,
+        )
+        kernel = measure(median_filter_cpu, x, width, repeat=repeat)
+        print(f"{n_heads:>8} {n_tokens:>8} {n_frames:>8} {sort:>10.3f} {kernel:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--band", type=float, default=0.1)
+    parser.add_argument("--medfilt_width", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.threads > 0:
+        numba.set_num_threads(args.threads)
+
+    benchmark_dtw(DTW_SIZES, args.repeat, args.band)
+    print()
+    benchmark_median_filter(MEDIAN_FILTER_SIZES, args.repeat, args.medfilt_width)
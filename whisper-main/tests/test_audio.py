@@ -1,8 +1,19 @@
 import os.path
+import wave
 
 import numpy as np
+import pytest
 
-from whisper.audio import SAMPLE_RATE, load_audio, log_mel_spectrogram
+from whisper.audio import (
+    _AUDIO_DECODERS,
+    SAMPLE_RATE,
+    AudioDecoder,
+    FFmpegDecoder,
+    find_audio_decoder,
+    load_audio,
+    log_mel_spectrogram,
+    register_audio_decoder,
+)
 
 
 def test_audio():
@@ -17,3 +28,65 @@ def test_audio():
 
     assert np.allclose(mel_from_audio, mel_from_file)
     assert mel_from_audio.max() - mel_from_audio.min() <= 2.0
+
+
+def write_wav(path, samples: np.ndarray, sr: int, n_channels: int = 1):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(n_channels)
+        f.setsampwidth(2)
+        f.setframerate(sr)
+        f.writeframes(samples.astype("<i2").tobytes())
+
+
+def test_load_wav_in_process(tmp_path, monkeypatch):
+    def no_ffmpeg(*args, **kwargs):
+        raise AssertionError("ffmpeg should not be used for PCM WAV")
+
+    monkeypatch.setattr(FFmpegDecoder, "decode", no_ffmpeg)
+
+    samples = (np.random.randn(SAMPLE_RATE) * 3000).astype(np.int16)
+    write_wav(tmp_path / "mono.wav", samples, SAMPLE_RATE)
+    audio = load_audio(str(tmp_path / "mono.wav"))
+    assert audio.dtype == np.float32
+    assert np.allclose(audio, samples / 32768.0)
+
+    stereo = np.stack([samples, samples // 2], axis=-1).flatten()
+    write_wav(tmp_path / "stereo.wav", stereo, SAMPLE_RATE // 2, n_channels=2)
+    audio = load_audio(str(tmp_path / "stereo.wav"))
+    assert audio.ndim == 1
+    assert audio.shape[0] == SAMPLE_RATE * 2
+
+
+def test_find_audio_decoder(tmp_path):
+    samples = (np.random.randn(SAMPLE_RATE) * 3000).astype(np.int16)
+    write_wav(tmp_path / "mono.wav", samples, SAMPLE_RATE)
+    assert not isinstance(find_audio_decoder(str(tmp_path / "mono.wav")), FFmpegDecoder)
+
+    (tmp_path / "audio.mp3").write_bytes(b"ID3" + bytes(64))
+    decoder = find_audio_decoder(str(tmp_path / "audio.mp3"))
+    assert isinstance(decoder, FFmpegDecoder)
+    assert decoder.command("audio.mp3", SAMPLE_RATE)[-3:] == ["-ar", "16000", "-"]
+
+    pcm = samples.astype("<i2").tobytes()
+    assert np.allclose(FFmpegDecoder.to_waveform(pcm), samples / 32768.0)
+
+
+def test_register_audio_decoder(monkeypatch):
+    monkeypatch.setattr("whisper.audio._AUDIO_DECODERS", list(_AUDIO_DECODERS))
+
+    class Incomplete(AudioDecoder):
+        def can_decode(self, file, sr):
+            return True
+
+    class Silence(Incomplete):
+        def decode(self, file, sr):
+            return np.zeros(sr, dtype=np.float32)
+
+    with pytest.raises(TypeError):
+        register_audio_decoder(Incomplete)
+    with pytest.raises(TypeError):
+        register_audio_decoder(FFmpegDecoder.to_waveform)
+
+    register_audio_decoder(Silence)
+    assert isinstance(find_audio_decoder("audio.xyz"), Silence)
+    assert load_audio("audio.xyz").shape == (SAMPLE_RATE,)
@@ -3,7 +3,21 @@ import pytest
 import scipy.ndimage
 import torch
 
-from whisper.timing import dtw_cpu, dtw_cuda, median_filter
+from whisper.audio import N_FRAMES
+from whisper.model import ModelDimensions, MultiHeadAttention, Whisper, disable_sdpa
+from whisper.timing import (
+    dtw,
+    dtw_band_radius,
+    dtw_cpu,
+    dtw_cpu_banded,
+    dtw_cpu_parallel,
+    dtw_cuda,
+    find_alignment,
+    median_filter,
+    median_filter_cpu,
+    warm_up_kernels,
+)
+from whisper.tokenizer import get_tokenizer
 
 sizes = [
     (10, 20),
@@ -52,6 +66,69 @@ def test_dtw(N: int, M: int):
     assert np.allclose(trace, dtw_trace)
 
 
+@pytest.mark.parametrize("N, M", sizes)
+def test_dtw_parallel_equivalence(N: int, M: int):
+    x = np.random.randn(N, M).astype(np.float32)
+
+    trace_cpu = dtw_cpu(x)
+    trace_parallel = dtw_cpu_parallel(x)
+
+    assert np.array_equal(trace_cpu, trace_parallel)
+
+
+def test_dtw_parallel_threshold(monkeypatch):
+    calls = []
+    monkeypatch.setattr("whisper.timing.numba.get_num_threads", lambda: 4)
+    monkeypatch.setattr(
+        "whisper.timing.dtw_cpu_parallel", lambda x: calls.append(x.shape) or dtw_cpu(x)
+    )
+    x = torch.randn(16, 1500)
+
+    # off by default
+    dtw(x)
+    assert calls == []
+
+    # a long window with few tokens has short diagonals
+    monkeypatch.setattr("whisper.timing.DTW_PARALLEL_MIN_DIAGONAL", 100)
+    dtw(x)
+    assert calls == []
+    dtw(torch.randn(128, 1500))
+    assert calls == [(128, 1500)]
+
+
+@pytest.mark.parametrize("N, M", sizes)
+def test_dtw_banded(N: int, M: int):
+    x = np.random.randn(N, M)
+
+    # a band covering the whole matrix is the full DTW
+    trace_banded, hit_edge = dtw_cpu_banded(x, M + 1)
+    assert not hit_edge
+    assert np.array_equal(dtw_cpu(x), trace_banded)
+
+    # a path that strays from the diagonal hits the band edge and falls back
+    x[:, 0] -= 10
+    x[-1, :] -= 10
+    radius = dtw_band_radius(N, M, 0.05)
+    _, hit_edge = dtw_cpu_banded(x, radius)
+    assert hit_edge or 2 * radius >= M
+    assert np.array_equal(dtw_cpu(x), dtw(torch.from_numpy(x), band=0.05))
+
+
+def test_warm_up_kernels():
+    report = warm_up_kernels()
+    assert set(report) == {
+        "dtw_cpu",
+        "dtw_cpu_parallel",
+        "dtw_cpu_banded",
+        "median_filter",
+        "backtrace",
+    }
+    assert set(report.values()) <= {"compiled", "loaded", "ready"}
+
+    # everything is compiled in this process now
+    assert set(warm_up_kernels().values()) == {"ready"}
+
+
 @pytest.mark.requires_cuda
 @pytest.mark.parametrize("N, M", sizes)
 def test_dtw_cuda_equivalence(N: int, M: int):
@@ -84,6 +161,19 @@ def test_median_filter(shape):
         assert np.allclose(filtered, scipy_filtered)
 
 
+@pytest.mark.parametrize("shape", shapes)
+def test_median_filter_cpu(shape):
+    # rounding produces ties within the windows
+    for x in [torch.randn(*shape), torch.randn(*shape).round()]:
+        for filter_width in [3, 5, 7, 13]:
+            if x.shape[-1] < filter_width:
+                continue
+            filtered = median_filter_cpu(x, filter_width)
+            expected = x.unfold(-1, filter_width, 1).sort()[0][..., filter_width // 2]
+
+            assert torch.equal(filtered, expected)
+
+
 @pytest.mark.requires_cuda
 @pytest.mark.parametrize("shape", shapes)
 def test_median_filter_equivalence(shape):
@@ -94,3 +184,58 @@ def test_median_filter_equivalence(shape):
         filtered_gpu = median_filter(x.cuda(), filter_width).cpu()
 
         assert np.allclose(filtered_cpu, filtered_gpu)
+
+
+def test_find_alignment_reuses_audio_features():
+    torch.manual_seed(42)
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=64,
+        n_audio_head=2,
+        n_audio_layer=2,
+        n_vocab=51865,
+        n_text_ctx=448,
+        n_text_state=64,
+        n_text_head=4,
+        n_text_layer=4,
+    )
+    model = Whisper(dims).eval()
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    tokenizer = get_tokenizer(True, language="en", task="transcribe")
+    text_tokens = tokenizer.encode(" And so my fellow Americans ask not")
+    mel = torch.randn(80, N_FRAMES)
+    with torch.no_grad():
+        audio_features = model.embed_audio(mel[None])[0]
+
+    encoder_calls = []
+    model.encoder.register_forward_hook(lambda *_: encoder_calls.append(1))
+
+    expected = find_alignment(model, tokenizer, text_tokens, mel, 1000)
+    assert len(encoder_calls) == 1
+    alignment = find_alignment(
+        model, tokenizer, text_tokens, mel, 1000, audio_features=audio_features
+    )
+    assert len(encoder_calls) == 1
+
+    assert [w.word for w in alignment] == [w.word for w in expected]
+    assert [w.start for w in alignment] == [w.start for w in expected]
+    assert np.allclose(
+        [w.probability for w in alignment], [w.probability for w in expected]
+    )
+
+
+def test_attention_qk_heads():
+    torch.manual_seed(42)
+    attn = MultiHeadAttention(64, 4).eval()
+    attn.qk_heads = [1, 3]
+    x, xa = torch.randn(1, 12, 64), torch.randn(1, 50, 64)
+
+    with torch.no_grad():
+        out, qk = attn(x, xa)
+        with disable_sdpa():
+            expected_out, expected_qk = attn(x, xa)
+
+    assert qk.shape == (1, 2, 12, 50)
+    assert torch.allclose(out, expected_out, atol=1e-5)
+    assert torch.allclose(qk, expected_qk, atol=1e-5)
@@ -1,6 +1,6 @@
 import pytest
 
-from whisper.tokenizer import get_tokenizer
+from whisper.tokenizer import Tokenizer, get_tokenizer, load_encoding
 
 
 @pytest.mark.parametrize("multilingual", [True, False])
@@ -32,3 +32,30 @@ def test_split_on_unicode():
 
     assert words == [" elle", " est", " l", "'", "\ufffd", "é", "rit", "oire"]
     assert word_tokens == [[8404], [871], [287], [6], [246], [526], [3210], [20378]]
+
+
+@pytest.mark.parametrize("name", ["multilingual", "gpt2"])
+def test_tokenizer_cache(tmp_path, name):
+    encoding, token_sets = load_encoding(name, 99, str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+
+    cached_encoding, cached_token_sets = load_encoding(name, 99, str(tmp_path))
+    assert cached_token_sets == token_sets
+
+    text = "다람쥐 헌 쳇바퀴에 타고파 ♪♪"
+    assert cached_encoding.encode(text) == encoding.encode(text)
+    assert cached_encoding.n_vocab == encoding.n_vocab
+
+    tokenizer = Tokenizer(encoding=cached_encoding, num_languages=99)
+    for key, tokens in cached_token_sets.items():
+        assert getattr(tokenizer, key) == tokens
+
+
+def test_tokenizer_cache_write_failure(tmp_path, monkeypatch):
+    def replace(source, destination):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("whisper.tokenizer.os.replace", replace)
+    encoding, _ = load_encoding("gpt2", 99, str(tmp_path))
+    assert encoding.encode("hello") == [31373]
+    assert list(tmp_path.iterdir()) == []
@@ -1,10 +1,21 @@
 import os
+from dataclasses import replace
 
+import numpy as np
 import pytest
 import torch
 
 import whisper
+from whisper.audio import SAMPLE_RATE
+from whisper.decoding import (
+    DecodingOptions,
+    DecodingTask,
+    SuppressTokens,
+    TranscriptionObserver,
+)
+from whisper.model import ModelDimensions, Whisper
 from whisper.tokenizer import get_tokenizer
+from whisper.transcribe import detect_transcription_language
 
 
 @pytest.mark.parametrize("model_name", whisper.available_models())
@@ -40,3 +51,159 @@ def test_transcribe(model_name: str):
                 timing_checked = True
 
     assert timing_checked
+
+
+def tiny_random_model() -> Whisper:
+    torch.manual_seed(42)
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=64,
+        n_audio_head=2,
+        n_audio_layer=2,
+        n_vocab=51865,
+        n_text_ctx=448,
+        n_text_state=64,
+        n_text_head=2,
+        n_text_layer=2,
+    )
+    model = Whisper(dims).eval()
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    return model
+
+
+def test_transcribe_reuses_detection_features():
+    model = tiny_random_model()
+    audio = np.random.randn(SAMPLE_RATE * 5).astype(np.float32) * 0.1
+
+    encoder_calls = []
+    model.encoder.register_forward_hook(lambda *_: encoder_calls.append(1))
+
+    expected = model.transcribe(audio, temperature=0.0, fp16=False)
+    assert len(encoder_calls) == 1  # shared by language detection and decoding
+
+    language, _, audio_features = detect_transcription_language(model, audio)
+    assert language == expected["language"]
+
+    encoder_calls.clear()
+    result = model.transcribe(
+        audio, temperature=0.0, fp16=False, audio_features=audio_features
+    )
+    assert len(encoder_calls) == 0
+    assert result["text"] == expected["text"]
+
+
+def test_detect_language_multiple_windows():
+    model = tiny_random_model()
+    audio = np.random.randn(SAMPLE_RATE * 100).astype(np.float32) * 0.1
+
+    encoder_batches = []
+    model.encoder.register_forward_hook(
+        lambda _, inputs, __: encoder_batches.append(inputs[0].shape[0])
+    )
+
+    # an unreachable threshold samples every window: the first alone, then the rest batched
+    _, probs, audio_features = detect_transcription_language(
+        model, audio, max_windows=4, confidence_threshold=1.1
+    )
+    assert encoder_batches == [1, 3]
+    assert abs(sum(probs.values()) - 1.0) < 1e-4
+    assert audio_features.shape == (1500, 64)
+
+    # a confident first window stops early
+    encoder_batches.clear()
+    detect_transcription_language(model, audio, max_windows=4, confidence_threshold=0.0)
+    assert encoder_batches == [1]
+
+
+def test_detect_language_observer():
+    class Recorder(TranscriptionObserver):
+        def __init__(self):
+            self.calls = []
+
+        def audio_encoded(self, seconds):
+            self.calls.append(("encoder", seconds))
+
+        def language_detected(self, windows, seconds):
+            self.calls.append(("language", windows))
+
+    model = tiny_random_model()
+    audio = np.random.RandomState(0).randn(SAMPLE_RATE * 100).astype(np.float32) * 0.1
+
+    observer = Recorder()
+    detect_transcription_language(
+        model, audio, max_windows=4, confidence_threshold=1.1, observer=observer
+    )
+    assert [stage for stage, _ in observer.calls] == ["encoder", "encoder", "language"]
+    assert observer.calls[-1] == ("language", 4)
+
+    # transcribe() reports the detection when no language is given
+    observer = Recorder()
+    model.transcribe(audio[:SAMPLE_RATE], fp16=False, sample_len=4, observer=observer)
+    stages = [stage for stage, _ in observer.calls]
+    assert stages[:2] == ["encoder", "language"]
+    assert observer.calls[1] == ("language", 1)
+
+
+def test_decoding_task_update_prompt():
+    model = tiny_random_model()
+    mel = torch.randn(1, 80, 3000)
+    options = DecodingOptions(language="en", fp16=False, sample_len=8)
+    prompt = get_tokenizer(True).encode(" And so my fellow Americans")
+
+    task = DecodingTask(model, options)
+    task.run(mel)
+    task.update_prompt(prompt)
+    fresh = DecodingTask(model, replace(options, prompt=prompt))
+
+    assert task.initial_tokens == fresh.initial_tokens
+    assert task.sample_begin == fresh.sample_begin
+    assert task.run(mel)[0].tokens == fresh.run(mel)[0].tokens
+
+
+def test_suppress_tokens_mask():
+    suppress_tokens = [3, 5, 11]
+    logits = torch.randn(2, 16)
+    expected = logits.clone()
+    expected[:, suppress_tokens] = -np.inf
+
+    SuppressTokens(suppress_tokens).apply(logits, torch.zeros(2, 1))
+    assert torch.equal(logits, expected)
+
+
+def test_transcription_observer():
+    class Recorder(TranscriptionObserver):
+        def __init__(self):
+            self.calls = []
+
+        def mel_computed(self, seconds):
+            self.calls.append(("mel", seconds))
+
+        def audio_encoded(self, seconds):
+            self.calls.append(("encoder", seconds))
+
+        def tokens_decoded(self, steps, seconds):
+            self.calls.append(("decoder", steps))
+
+        def window_decoded(self, fallbacks):
+            self.calls.append(("window", fallbacks))
+
+    model = tiny_random_model()
+    audio = np.random.RandomState(0).randn(SAMPLE_RATE).astype(np.float32) * 0.1
+    observer = Recorder()
+    model.transcribe(
+        audio,
+        language="en",
+        fp16=False,
+        sample_len=8,
+        temperature=(0.0, 0.5),
+        observer=observer,
+    )
+
+    stages = [stage for stage, _ in observer.calls]
+    assert stages[0] == "mel"
+    assert stages.count("encoder") == stages.count("decoder") >= 1
+    windows = [value for stage, value in observer.calls if stage == "window"]
+    assert len(windows) >= 1 and all(0 <= fallbacks <= 1 for fallbacks in windows)
+    assert sum(windows) + len(windows) == stages.count("decoder")
+    assert all(0 < steps <= 8 for stage, steps in observer.calls if stage == "decoder")
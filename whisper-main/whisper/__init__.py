@@ -9,7 +9,13 @@ import torch
 from tqdm import tqdm
 
 from .audio import load_audio, log_mel_spectrogram, pad_or_trim
-from .decoding import DecodingOptions, DecodingResult, decode, detect_language
+from .decoding import (
+    DecodingOptions,
+    DecodingResult,
+    TranscriptionObserver,
+    decode,
+    detect_language,
+)
 from .model import ModelDimensions, Whisper
 from .transcribe import transcribe
 from .version import __version__
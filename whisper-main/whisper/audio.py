@@ -1,7 +1,11 @@
+import importlib.util
 import os
+import wave
+from abc import ABC, abstractmethod
 from functools import lru_cache
+from math import gcd
 from subprocess import CalledProcessError, run
-from typing import Optional, Union
+from typing import List, Optional, Type, Union
 
 import numpy as np
 import torch
@@ -22,10 +26,187 @@ FRAMES_PER_SECOND = exact_div(SAMPLE_RATE, HOP_LENGTH)  # 10ms per audio frame
 TOKENS_PER_SECOND = exact_div(SAMPLE_RATE, N_SAMPLES_PER_TOKEN)  # 20ms per audio token
 
 
+class AudioDecoder(ABC):
+    @abstractmethod
+    def can_decode(self, file: str, sr: int) -> bool:
+        """Return True if this decoder is able to read the given audio file at `sr` Hz"""
+
+    @abstractmethod
+    def decode(self, file: str, sr: int) -> np.ndarray:
+        """Read the file as a mono float32 waveform sampled at `sr` Hz"""
+
+
+def _read_magic(file: str, size: int = 12) -> bytes:
+    try:
+        with open(file, "rb") as f:
+            return f.read(size)
+    except (OSError, TypeError):
+        return b""
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resample a mono waveform using a polyphase FIR filter (scipy.signal.resample_poly)
+    """
+    if orig_sr == target_sr:
+        return audio
+
+    from scipy.signal import resample_poly
+
+    g = gcd(orig_sr, target_sr)
+    return resample_poly(audio, target_sr // g, orig_sr // g).astype(np.float32)
+
+
+def _can_resample(orig_sr: int, target_sr: int) -> bool:
+    if orig_sr == target_sr:
+        return True
+    return importlib.util.find_spec("scipy") is not None
+
+
+class WaveDecoder(AudioDecoder):
+    """Reads integer PCM WAV files in-process using the standard library `wave` module"""
+
+    def can_decode(self, file: str, sr: int) -> bool:
+        magic = _read_magic(file)
+        if magic[:4] != b"RIFF" or magic[8:12] != b"WAVE":
+            return False
+        try:
+            with wave.open(file, "rb") as f:
+                return f.getsampwidth() in (1, 2, 3, 4) and _can_resample(
+                    f.getframerate(), sr
+                )
+        except (wave.Error, EOFError):
+            return False  # e.g. WAVE_FORMAT_IEEE_FLOAT or WAVE_FORMAT_EXTENSIBLE
+
+    def decode(self, file: str, sr: int) -> np.ndarray:
+        with wave.open(file, "rb") as f:
+            n_channels = f.getnchannels()
+            width = f.getsampwidth()
+            rate = f.getframerate()
+            data = f.readframes(f.getnframes())
+
+        if width == 1:  # 8-bit WAV is unsigned
+            audio = (np.frombuffer(data, np.uint8).astype(np.float32) - 128) / 128.0
+        elif width == 3:  # 24-bit little-endian; widen to int32 via the top three bytes
+            raw = np.frombuffer(data, np.uint8).reshape(-1, 3)
+            padded = np.zeros((raw.shape[0], 4), dtype=np.uint8)
+            padded[:, 1:] = raw
+            audio = padded.view("<i4").flatten().astype(np.float32) / 2147483648.0
+        else:
+            dtype, scale = ("<i2", 32768.0) if width == 2 else ("<i4", 2147483648.0)
+            audio = np.frombuffer(data, dtype).astype(np.float32) / scale
+
+        if n_channels > 1:
+            audio = audio.reshape(-1, n_channels).mean(axis=1)
+
+        return resample(audio, rate, sr)
+
+
+class SoundFileDecoder(AudioDecoder):
+    """Reads uncompressed WAV and FLAC files in-process using `soundfile`, if installed"""
+
+    formats = {"WAV", "WAVEX", "FLAC", "AIFF"}
+
+    def can_decode(self, file: str, sr: int) -> bool:
+        magic = _read_magic(file)
+        if magic[:4] not in (b"RIFF", b"fLaC", b"FORM"):
+            return False
+        try:
+            import soundfile
+
+            info = soundfile.info(file)
+        except Exception:
+            return False
+        return info.format in self.formats and _can_resample(info.samplerate, sr)
+
+    def decode(self, file: str, sr: int) -> np.ndarray:
+        import soundfile
+
+        audio, rate = soundfile.read(file, dtype="float32", always_2d=True)
+        return resample(audio.mean(axis=1), rate, sr)
+
+
+class FFmpegDecoder(AudioDecoder):
+    """Decodes any container/codec supported by the ffmpeg CLI in a subprocess"""
+
+    def can_decode(self, file: str, sr: int) -> bool:
+        return True
+
+    def command(self, file: str, sr: int) -> List[str]:
+        """The ffmpeg command writing the file as mono 16-bit PCM at `sr` Hz to stdout"""
+        # fmt: off
+        return [
+            "ffmpeg",
+            "-nostdin",
+            "-threads", "0",
+            "-i", file,
+            "-f", "s16le",
+            "-ac", "1",
+            "-acodec", "pcm_s16le",
+            "-ar", str(sr),
+            "-"
+        ]
+        # fmt: on
+
+    @staticmethod
+    def to_waveform(out: bytes) -> np.ndarray:
+        """Convert the output of `command()` to a float32 waveform"""
+        return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+    def decode(self, file: str, sr: int) -> np.ndarray:
+        # This launches a subprocess to decode audio while down-mixing
+        # and resampling as necessary.  Requires the ffmpeg CLI in PATH.
+        try:
+            out = run(self.command(file, sr), capture_output=True, check=True).stdout
+        except CalledProcessError as e:
+            raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
+
+        return self.to_waveform(out)
+
+
+# decoders are tried in order; ffmpeg is the catch-all for compressed containers
+_AUDIO_DECODERS: List[AudioDecoder] = [
+    SoundFileDecoder(),
+    WaveDecoder(),
+    FFmpegDecoder(),
+]
+
+
+def register_audio_decoder(
+    decoder: Union[AudioDecoder, Type[AudioDecoder]], *, first: bool = True
+):
+    """
+    Add a decoder, or a decoder class to instantiate, to be tried by `load_audio()`, before
+    the built-in ones by default. A class that doesn't implement both `can_decode()` and
+    `decode()` can't be instantiated, and is rejected with a TypeError.
+    """
+    if isinstance(decoder, type):
+        decoder = decoder()
+    if not isinstance(decoder, AudioDecoder):
+        raise TypeError(f"Expected an AudioDecoder, got {type(decoder).__name__}")
+
+    if first:
+        _AUDIO_DECODERS.insert(0, decoder)
+    else:
+        _AUDIO_DECODERS.insert(len(_AUDIO_DECODERS) - 1, decoder)
+
+
+def find_audio_decoder(file: str, sr: int = SAMPLE_RATE) -> AudioDecoder:
+    """Return the first registered decoder able to read the file at `sr` Hz"""
+    for decoder in _AUDIO_DECODERS:
+        if decoder.can_decode(file, sr):
+            return decoder
+
+    raise RuntimeError(f"No audio decoder available for {file}")
+
+
 def load_audio(file: str, sr: int = SAMPLE_RATE):
     """
     Open an audio file and read as mono waveform, resampling as necessary
 
+    PCM WAV/FLAC files are read in-process when possible; other formats are decoded
+    by the ffmpeg CLI, see `register_audio_decoder()` to plug in other decoders.
+
     Parameters
     ----------
     file: str
@@ -38,28 +219,7 @@ def load_audio(file: str, sr: int = SAMPLE_RATE):
     -------
     A NumPy array containing the audio waveform, in float32 dtype.
     """
-
-    # This launches a subprocess to decode audio while down-mixing
-    # and resampling as necessary.  Requires the ffmpeg CLI in PATH.
-    # fmt: off
-    cmd = [
-        "ffmpeg",
-        "-nostdin",
-        "-threads", "0",
-        "-i", file,
-        "-f", "s16le",
-        "-ac", "1",
-        "-acodec", "pcm_s16le",
-        "-ar", str(sr),
-        "-"
-    ]
-    # fmt: on
-    try:
-        out = run(cmd, capture_output=True, check=True).stdout
-    except CalledProcessError as e:
-        raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
-
-    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+    return find_audio_decoder(file, sr).decode(file, sr)
 
 
 def pad_or_trim(array, length: int = N_SAMPLES, *, axis: int = -1):
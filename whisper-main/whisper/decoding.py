@@ -1,3 +1,4 @@
+import time
 from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
@@ -433,9 +434,21 @@ class SuppressBlank(LogitFilter):
 class SuppressTokens(LogitFilter):
     def __init__(self, suppress_tokens: Sequence[int]):
         self.suppress_tokens = list(suppress_tokens)
+        self.mask: Optional[Tensor] = None
 
     def apply(self, logits: Tensor, tokens: Tensor):
-        logits[:, self.suppress_tokens] = -np.inf
+        if (
+            self.mask is None
+            or self.mask.device != logits.device
+            or self.mask.shape[-1] != logits.shape[-1]
+        ):
+            # built once instead of indexing with (and copying) the Python list every step
+            self.mask = torch.zeros(
+                logits.shape[-1], dtype=torch.bool, device=logits.device
+            )
+            self.mask[self.suppress_tokens] = True
+
+        logits.masked_fill_(self.mask, -np.inf)
 
 
 class ApplyTimestampRules(LogitFilter):
@@ -505,14 +518,62 @@ class ApplyTimestampRules(LogitFilter):
                 logits[k, : self.tokenizer.timestamp_begin] = -np.inf
 
 
+class TranscriptionObserver:
+    """
+    Receives measurements of the stages of `transcribe()` and `DecodingTask.run()`, e.g. to
+    export them as metrics; durations are wall-clock seconds, and each method does nothing
+    unless overridden
+    """
+
+    def mel_computed(self, seconds: float) -> None:
+        """The log-Mel spectrogram of the whole audio was computed"""
+        pass
+
+    def audio_encoded(self, seconds: float) -> None:
+        """A batch of 30-second windows went through the audio encoder"""
+        pass
+
+    def language_detected(self, windows: int, seconds: float) -> None:
+        """
+        The spoken language was detected from `windows` 30-second windows; their encoder
+        passes are also reported to `audio_encoded()`
+        """
+        pass
+
+    def tokens_decoded(self, steps: int, seconds: float) -> None:
+        """The sampling loop ran `steps` forward passes of the text decoder"""
+        pass
+
+    def window_decoded(self, fallbacks: int) -> None:
+        """A window was decoded, after retrying `fallbacks` times at a higher temperature"""
+        pass
+
+    def word_timestamps_added(self, seconds: float) -> None:
+        """The words of a window's segments were aligned to the audio"""
+        pass
+
+
+def synchronized_time(device: torch.device) -> float:
+    """The current time, once the kernels queued on a CUDA device have run"""
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+    return time.perf_counter()
+
+
 class DecodingTask:
     inference: Inference
     sequence_ranker: SequenceRanker
     decoder: TokenDecoder
     logit_filters: List[LogitFilter]
 
-    def __init__(self, model: "Whisper", options: DecodingOptions):
+    def __init__(
+        self,
+        model: "Whisper",
+        options: DecodingOptions,
+        observer: Optional[TranscriptionObserver] = None,
+    ):
         self.model = model
+        self.observer = observer
 
         language = options.language or "en"
         tokenizer = get_tokenizer(
@@ -532,40 +593,63 @@ class DecodingTask:
         if self.options.without_timestamps:
             self.sot_sequence = tokenizer.sot_sequence_including_notimestamps
 
+        # sequence ranker: implements how to rank a group of sampled sequences
+        self.sequence_ranker = MaximumLikelihoodRanker(options.length_penalty)
+
+        # the suppressed tokens don't depend on the prompt; their mask is kept across prompts
+        self.suppress_tokens: Optional[SuppressTokens] = None
+        if self.options.suppress_tokens:
+            self.suppress_tokens = SuppressTokens(self._get_suppress_tokens())
+
+        self.max_initial_timestamp_index: Optional[int] = None
+        if options.max_initial_timestamp:
+            precision = CHUNK_LENGTH / model.dims.n_audio_ctx  # usually 0.02 seconds
+            self.max_initial_timestamp_index = round(
+                self.options.max_initial_timestamp / precision
+            )
+
+        self.update_prompt(options.prompt, options.prefix)
+
+    def update_prompt(
+        self,
+        prompt: Optional[Union[str, List[int]]],
+        prefix: Optional[Union[str, List[int]]] = None,
+    ):
+        """
+        Set up the task to decode with another prompt and prefix, e.g. for the next window of
+        `transcribe()`, keeping the tokenizer and the suppressed tokens of the other options
+        """
+        self.options = replace(self.options, prompt=prompt, prefix=prefix)
+        tokenizer = self.tokenizer
+
         self.initial_tokens: Tuple[int] = self._get_initial_tokens()
         self.sample_begin: int = len(self.initial_tokens)
         self.sot_index: int = self.initial_tokens.index(tokenizer.sot)
 
         # inference: implements the forward pass through the decoder, including kv caching
-        self.inference = PyTorchInference(model, len(self.initial_tokens))
-
-        # sequence ranker: implements how to rank a group of sampled sequences
-        self.sequence_ranker = MaximumLikelihoodRanker(options.length_penalty)
+        self.inference = PyTorchInference(self.model, len(self.initial_tokens))
 
         # decoder: implements how to select the next tokens, given the autoregressive distribution
-        if options.beam_size is not None:
+        if self.options.beam_size is not None:
             self.decoder = BeamSearchDecoder(
-                options.beam_size, tokenizer.eot, self.inference, options.patience
+                self.options.beam_size,
+                tokenizer.eot,
+                self.inference,
+                self.options.patience,
             )
         else:
-            self.decoder = GreedyDecoder(options.temperature, tokenizer.eot)
+            self.decoder = GreedyDecoder(self.options.temperature, tokenizer.eot)
 
         # logit filters: applies various rules to suppress or penalize certain tokens
         self.logit_filters = []
         if self.options.suppress_blank:
             self.logit_filters.append(SuppressBlank(self.tokenizer, self.sample_begin))
-        if self.options.suppress_tokens:
-            self.logit_filters.append(SuppressTokens(self._get_suppress_tokens()))
-        if not options.without_timestamps:
-            precision = CHUNK_LENGTH / model.dims.n_audio_ctx  # usually 0.02 seconds
-            max_initial_timestamp_index = None
-            if options.max_initial_timestamp:
-                max_initial_timestamp_index = round(
-                    self.options.max_initial_timestamp / precision
-                )
+        if self.suppress_tokens is not None:
+            self.logit_filters.append(self.suppress_tokens)
+        if not self.options.without_timestamps:
             self.logit_filters.append(
                 ApplyTimestampRules(
-                    tokenizer, self.sample_begin, max_initial_timestamp_index
+                    tokenizer, self.sample_begin, self.max_initial_timestamp_index
                 )
             )
 
@@ -651,6 +735,10 @@ class DecodingTask:
         ):
             # encoded audio features are given; skip audio encoding
             audio_features = mel
+        elif self.observer is not None:
+            start = synchronized_time(mel.device)
+            audio_features = self.model.encoder(mel)
+            self.observer.audio_encoded(synchronized_time(mel.device) - start)
         else:
             audio_features = self.model.encoder(mel)
 
@@ -681,9 +769,11 @@ class DecodingTask:
         n_batch = tokens.shape[0]
         sum_logprobs: Tensor = torch.zeros(n_batch, device=audio_features.device)
         no_speech_probs = [np.nan] * n_batch
+        start, steps = time.perf_counter(), 0
 
         try:
             for i in range(self.sample_len):
+                steps += 1
                 logits = self.inference.logits(tokens, audio_features)
 
                 if (
@@ -707,6 +797,10 @@ class DecodingTask:
         finally:
             self.inference.cleanup_caching()
 
+        if self.observer is not None:
+            # each step reads the sampled tokens back, so the device has finished by now
+            self.observer.tokens_decoded(steps, time.perf_counter() - start)
+
         return tokens, sum_logprobs, no_speech_probs
 
     @torch.no_grad()
@@ -2,7 +2,7 @@ import base64
 import gzip
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -89,6 +89,10 @@ class MultiHeadAttention(nn.Module):
         self.value = Linear(n_state, n_state)
         self.out = Linear(n_state, n_state)
 
+        # if set, only the attention logits of these heads are returned as `qk`,
+        # which are then computed even when using scaled_dot_product_attention
+        self.qk_heads: Optional[List[int]] = None
+
     def forward(
         self,
         x: Tensor,
@@ -126,6 +130,12 @@ class MultiHeadAttention(nn.Module):
             )
             out = a.permute(0, 2, 1, 3).flatten(start_dim=2)
             qk = None
+            if self.qk_heads is not None:
+                q, k = q[:, self.qk_heads], k[:, self.qk_heads]
+                qk = (q * scale) @ (k * scale).transpose(-1, -2)
+                if mask is not None:
+                    qk = qk + mask[:n_ctx, :n_ctx]
+                qk = qk.float().detach()
         else:
             qk = (q * scale) @ (k * scale).transpose(-1, -2)
             if mask is not None:
@@ -135,6 +145,8 @@ class MultiHeadAttention(nn.Module):
             w = F.softmax(qk, dim=-1).to(q.dtype)
             out = (w @ v).permute(0, 2, 1, 3).flatten(start_dim=2)
             qk = qk.detach()
+            if self.qk_heads is not None:
+                qk = qk[:, self.qk_heads]
 
         return out, qk
 
@@ -1,8 +1,10 @@
 import itertools
+import os
 import subprocess
+import types
 import warnings
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import numba
 import numpy as np
@@ -16,6 +18,51 @@ if TYPE_CHECKING:
     from .model import Whisper
 
 
+@numba.jit(nopython=True, cache=True)
+def _median_filter_rows(x: np.ndarray, filter_width: int):
+    rows, width = x.shape
+    result = np.empty((rows, width - filter_width + 1), dtype=x.dtype)
+    window = np.empty(filter_width, dtype=x.dtype)
+    for r in range(rows):
+        # insertion sort of the first window
+        for k in range(filter_width):
+            value = x[r, k]
+            m = k
+            while m > 0 and window[m - 1] > value:
+                window[m] = window[m - 1]
+                m -= 1
+            window[m] = value
+        result[r, 0] = window[filter_width // 2]
+
+        # then slide it: the leaving value is replaced by the entering one, which is
+        # moved into place, keeping the window sorted in O(filter_width) per step
+        for i in range(1, result.shape[1]):
+            leaving = x[r, i - 1]
+            value = x[r, i + filter_width - 1]
+            m = 0
+            while m < filter_width - 1 and window[m] != leaving:
+                m += 1
+            while m > 0 and window[m - 1] > value:
+                window[m] = window[m - 1]
+                m -= 1
+            while m < filter_width - 1 and window[m + 1] < value:
+                window[m] = window[m + 1]
+                m += 1
+            window[m] = value
+            result[r, i] = window[filter_width // 2]
+    return result
+
+
+def median_filter_cpu(x: torch.Tensor, filter_width: int):
+    """
+    Apply a median filter of given width along the last dimension of the padded CPU tensor x,
+    without materializing the windows; NaNs are not supported
+    """
+    rows = x.detach().reshape(-1, x.shape[-1]).contiguous().numpy()
+    result = _median_filter_rows(rows, filter_width)
+    return torch.from_numpy(result).reshape(*x.shape[:-1], -1)
+
+
 def median_filter(x: torch.Tensor, filter_width: int):
     """Apply a median filter of width `filter_width` along the last dimension of `x`"""
     pad_width = filter_width // 2
@@ -43,6 +90,12 @@ def median_filter(x: torch.Tensor, filter_width: int):
                 "Failed to launch Triton kernels, likely due to missing CUDA toolkit; "
                 "falling back to a slower median kernel implementation..."
             )
+    elif (
+        x.device.type == "cpu"
+        and x.dtype in (torch.float32, torch.float64)
+        and not x.isnan().any()
+    ):
+        result = median_filter_cpu(x, filter_width)
 
     if result is None:
         # sort() is faster than torch.median (https://github.com/pytorch/pytorch/issues/51450)
@@ -54,7 +107,7 @@ def median_filter(x: torch.Tensor, filter_width: int):
     return result
 
 
-@numba.jit(nopython=True)
+@numba.jit(nopython=True, cache=True)
 def backtrace(trace: np.ndarray):
     i = trace.shape[0] - 1
     j = trace.shape[1] - 1
@@ -79,18 +132,27 @@ def backtrace(trace: np.ndarray):
     return result[::-1, :].T
 
 
-@numba.jit(nopython=True, parallel=True)
-def dtw_cpu(x: np.ndarray):
+def _dtw_wavefront(x: np.ndarray):
+    """
+    DTW computed one anti-diagonal (i + j == d) at a time: every cell of a diagonal only
+    depends on the two previous diagonals, so the inner loop has no loop-carried dependency
+    and runs in parallel when compiled with `parallel=True`. The cells are read from `x` and
+    their trace written in place, so besides the int8 trace only three diagonals of the cost
+    matrix are kept, in float32.
+    """
     N, M = x.shape
-    cost = np.ones((N + 1, M + 1), dtype=np.float32) * np.inf
-    trace = -np.ones((N + 1, M + 1), dtype=np.float32)
 
+    # row d % 3 of cost holds the anti-diagonal i + j == d, indexed by i
+    cost = np.full((3, N + 1), np.inf, dtype=np.float32)
+    trace = np.full((N + 1, M + 1), -1, dtype=np.int8)
     cost[0, 0] = 0
-    for j in range(1, M + 1):
-        for i in range(1, N + 1):
-            c0 = cost[i - 1, j - 1]
-            c1 = cost[i - 1, j]
-            c2 = cost[i, j - 1]
+    for d in range(2, N + M + 1):
+        cost_d, cost_d1, cost_d2 = cost[d % 3], cost[(d - 1) % 3], cost[(d - 2) % 3]
+        cost_d[:] = np.inf
+        for i in numba.prange(max(1, d - M), min(N, d - 1) + 1):
+            c0 = cost_d2[i - 1]
+            c1 = cost_d1[i - 1]
+            c2 = cost_d1[i]
 
             if c0 < c1 and c0 < c2:
                 c, t = c0, 0
@@ -99,12 +161,112 @@ def dtw_cpu(x: np.ndarray):
             else:
                 c, t = c2, 2
 
-            cost[i, j] = x[i - 1, j - 1] + c
-            trace[i, j] = t
+            cost_d[i] = np.float32(x[i - 1, d - i - 1]) + c
+            trace[i, d - i] = t
 
     return backtrace(trace)
 
 
+def _renamed(fn, name: str):
+    """A copy of `fn` under another name, so that numba caches each variant in its own file"""
+    copy = types.FunctionType(fn.__code__.replace(co_name=name), fn.__globals__, name)
+    copy.__qualname__ = name
+    return copy
+
+
+dtw_cpu = numba.jit(nopython=True, cache=True)(_renamed(_dtw_wavefront, "dtw_cpu"))
+dtw_cpu_parallel = numba.jit(nopython=True, parallel=True, cache=True)(
+    _renamed(_dtw_wavefront, "dtw_cpu_parallel")
+)
+
+# the parallel kernel pays a thread synchronization per anti-diagonal, and a diagonal holds at
+# most min(N, M) cells, N being the token count: it can only pay off when both axes are long.
+# It is off by default, as no crossover has been measured on a multi-core machine yet; run
+# benchmarks/benchmark_timing.py there and set its result in WHISPER_DTW_PARALLEL_MIN_DIAGONAL
+DTW_PARALLEL_MIN_DIAGONAL = int(os.getenv("WHISPER_DTW_PARALLEL_MIN_DIAGONAL", 0))
+
+
+@numba.jit(nopython=True, cache=True)
+def dtw_cpu_banded(x: np.ndarray, radius: int):
+    """
+    DTW restricted to a Sakoe-Chiba band of `radius` frames around the straight line from
+    (0, 0) to (N, M). Only the cells inside the band are stored, as rows of the same width.
+    Returns the path and whether it touches the band edge, in which case the unrestricted
+    path may differ and the caller should fall back to the full DTW.
+    """
+    N, M = x.shape
+
+    lo = np.empty(N + 1, dtype=np.int64)
+    hi = np.empty(N + 1, dtype=np.int64)
+    for i in range(N + 1):
+        center = i * M / N
+        lo[i] = max(0, int(np.floor(center)) - radius)
+        hi[i] = min(M, int(np.ceil(center)) + radius)
+    W = np.max(hi - lo) + 1
+
+    cost = np.full((N + 1, W), np.inf)
+    trace = np.full((N + 1, W), -1, dtype=np.int8)
+    cost[0, 0] = 0
+    for i in range(1, N + 1):
+        for j in range(max(1, lo[i]), hi[i] + 1):
+            c0 = (
+                cost[i - 1, j - 1 - lo[i - 1]]
+                if lo[i - 1] < j <= hi[i - 1] + 1
+                else np.inf
+            )
+            c1 = cost[i - 1, j - lo[i - 1]] if lo[i - 1] <= j <= hi[i - 1] else np.inf
+            c2 = cost[i, j - 1 - lo[i]] if j > lo[i] else np.inf
+
+            if c0 < c1 and c0 < c2:
+                c, t = c0, 0
+            elif c1 < c0 and c1 < c2:
+                c, t = c1, 1
+            else:
+                c, t = c2, 2
+
+            cost[i, j - lo[i]] = x[i - 1, j - 1] + c
+            trace[i, j - lo[i]] = t
+
+    i, j = N, M
+    hit_edge = False
+    result = []
+    while i > 0 or j > 0:
+        result.append((i - 1, j - 1))
+
+        if i == 0:
+            t = 2
+        elif j == 0:
+            t = 1
+        else:
+            if (j == lo[i] and lo[i] > 0) or (j == hi[i] and hi[i] < M):
+                hit_edge = True
+            t = trace[i, j - lo[i]]
+
+        if t == 0:
+            i -= 1
+            j -= 1
+        elif t == 1:
+            i -= 1
+        elif t == 2:
+            j -= 1
+        else:
+            raise ValueError("Unexpected trace[i, j]")
+
+    result = np.array(result)
+    return result[::-1, :].T, hit_edge
+
+
+def dtw_band_radius(num_tokens: int, num_frames: int, band: float) -> int:
+    """
+    Radius of the Sakoe-Chiba band, in frames: `band` is the fraction of the segment duration
+    the alignment may drift from a constant speaking rate, but never less than two tokens'
+    worth of frames so that consecutive rows of the band always overlap
+    """
+    return max(
+        int(np.ceil(band * num_frames)), 2 * int(np.ceil(num_frames / num_tokens))
+    )
+
+
 def dtw_cuda(x, BLOCK_SIZE=1024):
     from .triton_ops import dtw_kernel
 
@@ -138,7 +300,14 @@ def dtw_cuda(x, BLOCK_SIZE=1024):
     return backtrace(trace.cpu().numpy())
 
 
-def dtw(x: torch.Tensor) -> np.ndarray:
+def dtw(x: torch.Tensor, band: Optional[float] = None) -> np.ndarray:
+    if band is not None:
+        radius = dtw_band_radius(*x.shape, band)
+        if 2 * radius < x.shape[1]:
+            path, hit_edge = dtw_cpu_banded(x.double().cpu().numpy(), radius)
+            if not hit_edge:
+                return path
+
     if x.is_cuda:
         try:
             return dtw_cuda(x)
@@ -148,7 +317,47 @@ def dtw(x: torch.Tensor) -> np.ndarray:
                 "falling back to a slower DTW implementation..."
             )
 
-    return dtw_cpu(x.double().cpu().numpy())
+    x = x.double().cpu().numpy()
+    if (
+        DTW_PARALLEL_MIN_DIAGONAL > 0
+        and numba.get_num_threads() > 1
+        and min(x.shape) >= DTW_PARALLEL_MIN_DIAGONAL
+    ):
+        return dtw_cpu_parallel(x)
+
+    return dtw_cpu(x)
+
+
+def warm_up_kernels() -> Dict[str, str]:
+    """
+    Compile the numba kernels used for word-level timestamps, or load them from numba's
+    on-disk cache, so that the first request with word timestamps does not stall on JIT
+    compilation. Returns, for each kernel, whether it was "compiled", "loaded" from the
+    cache, or already "ready" in this process.
+    """
+    x = np.zeros((2, 4))
+    kernels = {
+        "dtw_cpu": (dtw_cpu, (x,)),
+        "dtw_cpu_parallel": (dtw_cpu_parallel, (x,)),
+        "dtw_cpu_banded": (dtw_cpu_banded, (x, 1)),
+        "median_filter": (_median_filter_rows, (x.astype(np.float32), 3)),
+        # the strided int32 trace that `dtw_cuda` passes to the backtrace
+        "backtrace": (backtrace, (np.zeros((3, 4), dtype=np.int32)[:, :3],)),
+    }
+
+    report = {}
+    for name, (kernel, args) in kernels.items():
+        hits = sum(kernel.stats.cache_hits.values())
+        misses = sum(kernel.stats.cache_misses.values())
+        kernel(*args)
+        if sum(kernel.stats.cache_hits.values()) > hits:
+            report[name] = "loaded"
+        elif sum(kernel.stats.cache_misses.values()) > misses:
+            report[name] = "compiled"
+        else:
+            report[name] = "ready"
+
+    return report
 
 
 @dataclass
@@ -169,6 +378,8 @@ def find_alignment(
     *,
     medfilt_width: int = 7,
     qk_scale: float = 1.0,
+    audio_features: Optional[torch.Tensor] = None,
+    dtw_band: Optional[float] = None,
 ) -> List[WordTiming]:
     if len(text_tokens) == 0:
         return []
@@ -182,29 +393,41 @@ def find_alignment(
         ]
     ).to(model.device)
 
-    # install hooks on the cross attention layers to retrieve the attention weights
-    QKs = [None] * model.dims.n_text_layer
-    hooks = [
-        block.cross_attn.register_forward_hook(
-            lambda _, ins, outs, index=i: QKs.__setitem__(index, outs[-1][0])
+    # install hooks on the cross attention layers that contain alignment heads, which
+    # compute the attention weights of those heads only; other heads keep using SDPA
+    alignment_heads = model.alignment_heads.indices().T.tolist()
+    heads_per_layer = {}
+    for _l, _h in alignment_heads:
+        heads_per_layer.setdefault(_l, []).append(_h)
+
+    QKs = {}
+    hooks = []
+    for _l, heads in heads_per_layer.items():
+        cross_attn = model.decoder.blocks[_l].cross_attn
+        cross_attn.qk_heads = heads
+        hooks.append(
+            cross_attn.register_forward_hook(
+                lambda _, ins, outs, index=_l: QKs.__setitem__(index, outs[-1][0])
+            )
         )
-        for i, block in enumerate(model.decoder.blocks)
-    ]
 
-    from .model import disable_sdpa
-
-    with torch.no_grad(), disable_sdpa():
-        logits = model(mel.unsqueeze(0), tokens.unsqueeze(0))[0]
-        sampled_logits = logits[len(tokenizer.sot_sequence) :, : tokenizer.eot]
-        token_probs = sampled_logits.softmax(dim=-1)
-        text_token_probs = token_probs[np.arange(len(text_tokens)), text_tokens]
-        text_token_probs = text_token_probs.tolist()
-
-    for hook in hooks:
-        hook.remove()
+    try:
+        with torch.no_grad():
+            if audio_features is None:
+                audio_features = model.embed_audio(mel.unsqueeze(0))[0]
+            logits = model.logits(tokens.unsqueeze(0), audio_features.unsqueeze(0))[0]
+            sampled_logits = logits[len(tokenizer.sot_sequence) :, : tokenizer.eot]
+            token_probs = sampled_logits.softmax(dim=-1)
+            text_token_probs = token_probs[np.arange(len(text_tokens)), text_tokens]
+            text_token_probs = text_token_probs.tolist()
+    finally:
+        for _l in heads_per_layer:
+            model.decoder.blocks[_l].cross_attn.qk_heads = None
+        for hook in hooks:
+            hook.remove()
 
     # heads * tokens * frames
-    weights = torch.stack([QKs[_l][_h] for _l, _h in model.alignment_heads.indices().T])
+    weights = torch.cat([QKs[_l] for _l in heads_per_layer])
     weights = weights[:, :, : num_frames // 2]
     weights = (weights * qk_scale).softmax(dim=-1)
     std, mean = torch.std_mean(weights, dim=-2, keepdim=True, unbiased=False)
@@ -213,7 +436,7 @@ def find_alignment(
 
     matrix = weights.mean(axis=0)
     matrix = matrix[len(tokenizer.sot_sequence) : -1]
-    text_indices, time_indices = dtw(-matrix)
+    text_indices, time_indices = dtw(-matrix, band=dtw_band)
 
     words, word_tokens = tokenizer.split_to_word_tokens(text_tokens + [tokenizer.eot])
     if len(word_tokens) <= 1:
@@ -286,6 +509,7 @@ def add_word_timestamps(
     prepend_punctuations: str = "\"'“¿([{-",
     append_punctuations: str = "\"'.。,，!！?？:：”)]}、",
     last_speech_timestamp: float,
+    audio_features: Optional[torch.Tensor] = None,
     **kwargs,
 ):
     if len(segments) == 0:
@@ -297,7 +521,15 @@ def add_word_timestamps(
     ]
 
     text_tokens = list(itertools.chain.from_iterable(text_tokens_per_segment))
-    alignment = find_alignment(model, tokenizer, text_tokens, mel, num_frames, **kwargs)
+    alignment = find_alignment(
+        model,
+        tokenizer,
+        text_tokens,
+        mel,
+        num_frames,
+        audio_features=audio_features,
+        **kwargs,
+    )
     word_durations = np.array([t.end - t.start for t in alignment])
     word_durations = word_durations[word_durations.nonzero()]
     median_duration = np.median(word_durations) if len(word_durations) > 0 else 0.0
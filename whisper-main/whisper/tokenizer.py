@@ -1,10 +1,14 @@
 import base64
+import hashlib
 import os
 import string
+import tempfile
+import zipfile
 from dataclasses import dataclass, field
 from functools import cached_property, lru_cache
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import tiktoken
 
 LANGUAGES = {
@@ -138,6 +142,7 @@ class Tokenizer:
     task: Optional[str] = None
     sot_sequence: Tuple[int] = ()
     special_tokens: Dict[str, int] = field(default_factory=dict)
+    token_sets: Dict[str, Tuple[int]] = field(default_factory=dict)
 
     def __post_init__(self):
         for special in self.encoding.special_tokens_set:
@@ -224,6 +229,9 @@ class Tokenizer:
 
     @cached_property
     def all_language_tokens(self) -> Tuple[int]:
+        if "all_language_tokens" in self.token_sets:
+            return self.token_sets["all_language_tokens"]
+
         result = []
         for token, token_id in self.special_tokens.items():
             if token.strip("<|>") in LANGUAGES:
@@ -250,6 +258,9 @@ class Tokenizer:
 
         keeping basic punctuations like commas, periods, question marks, exclamation points, etc.
         """
+        if "non_speech_tokens" in self.token_sets:
+            return self.token_sets["non_speech_tokens"]
+
         symbols = list('"#()*+/:;<=>@[\\]^_`{|}~「」『』')
         symbols += (
             "<< >> <<< >>> -- --- -( -[ (' (\" (( )) ((( ))) [[ ]] {{ }} ♪♪ ♪♪♪".split()
@@ -327,13 +338,26 @@ class Tokenizer:
         return words, word_tokens
 
 
-@lru_cache(maxsize=None)
-def get_encoding(name: str = "gpt2", num_languages: int = 99):
-    vocab_path = os.path.join(os.path.dirname(__file__), "assets", f"{name}.tiktoken")
-    ranks = {
-        base64.b64decode(token): int(rank)
-        for token, rank in (line.split() for line in open(vocab_path) if line)
-    }
+# bump when the layout of the cache or the derivation of the token sets changes
+TOKENIZER_CACHE_VERSION = 1
+TOKEN_SETS = ("non_speech_tokens", "all_language_tokens")
+
+
+def _tokenizer_cache_dir() -> Optional[str]:
+    """
+    The directory shared across processes holding the parsed vocabularies and derived token
+    sets; set WHISPER_TOKENIZER_CACHE to relocate it, or to an empty string to disable it.
+    """
+    default = os.path.join(os.path.expanduser("~"), ".cache")
+    default = os.path.join(
+        os.getenv("XDG_CACHE_HOME", default), "whisper", "tokenizers"
+    )
+    return os.getenv("WHISPER_TOKENIZER_CACHE", default) or None
+
+
+def _build_encoding(
+    vocab_path: str, ranks: Dict[bytes, int], num_languages: int
+) -> tiktoken.Encoding:
     n_vocab = len(ranks)
     special_tokens = {}
 
@@ -363,6 +387,96 @@ def get_encoding(name: str = "gpt2", num_languages: int = 99):
     )
 
 
+def load_encoding(
+    name: str, num_languages: int, cache_dir: Optional[str] = None
+) -> Tuple[tiktoken.Encoding, Dict[str, Tuple[int]]]:
+    """
+    Load the encoding and the token sets derived from it, reading them from the cache in
+    `cache_dir` if present, or parsing the base64 vocabulary and writing the cache otherwise
+
+    Returns
+    -------
+    encoding : tiktoken.Encoding
+        The encoding with Whisper's special tokens
+
+    token_sets : Dict[str, Tuple[int]]
+        The token sets named in `TOKEN_SETS`, to be passed to `Tokenizer`
+    """
+    vocab_path = os.path.join(os.path.dirname(__file__), "assets", f"{name}.tiktoken")
+    with open(vocab_path, "rb") as f:
+        vocab = f.read()
+
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(vocab).hexdigest()[:16]
+        filename = f"{name}-{num_languages}-{digest}-v{TOKENIZER_CACHE_VERSION}.npz"
+        cache_path = os.path.join(cache_dir, filename)
+
+    if cache_path is not None and os.path.isfile(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as cache:
+                offsets = np.cumsum(cache["token_lengths"]).tolist()
+                token_bytes = cache["token_bytes"].tobytes()
+                ranks = {
+                    token_bytes[start:end]: rank
+                    for start, end, rank in zip(
+                        [0] + offsets[:-1], offsets, cache["ranks"].tolist()
+                    )
+                }
+                token_sets = {key: tuple(cache[key].tolist()) for key in TOKEN_SETS}
+            return _build_encoding(vocab_path, ranks, num_languages), token_sets
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            pass  # a corrupt cache is rebuilt below
+
+    ranks = {
+        base64.b64decode(token): int(rank)
+        for token, rank in (line.split() for line in vocab.splitlines() if line)
+    }
+    encoding = _build_encoding(vocab_path, ranks, num_languages)
+    tokenizer = Tokenizer(encoding=encoding, num_languages=num_languages)
+    token_sets = {key: getattr(tokenizer, key) for key in TOKEN_SETS}
+
+    if cache_path is not None:
+        temp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # written to a temporary file first so that concurrent readers never see a partial file
+            with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as f:
+                temp_path = f.name
+                np.savez(
+                    f,
+                    token_bytes=np.frombuffer(b"".join(ranks), dtype=np.uint8),
+                    token_lengths=np.array([len(t) for t in ranks], dtype=np.uint16),
+                    ranks=np.array(list(ranks.values()), dtype=np.int32),
+                    **{
+                        key: np.array(token_sets[key], dtype=np.int32)
+                        for key in TOKEN_SETS
+                    },
+                )
+            os.replace(temp_path, cache_path)
+        except OSError:
+            # the cache is only an optimization, e.g. on a read-only filesystem or a full disk;
+            # the temporary file is removed so that failed attempts don't pile up
+            if temp_path is not None and os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    return encoding, token_sets
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(
+    name: str, num_languages: int
+) -> Tuple[tiktoken.Encoding, Dict[str, Tuple[int]]]:
+    return load_encoding(name, num_languages, _tokenizer_cache_dir())
+
+
+def get_encoding(name: str = "gpt2", num_languages: int = 99):
+    return _get_encoding(name, num_languages)[0]
+
+
 @lru_cache(maxsize=None)
 def get_tokenizer(
     multilingual: bool,
@@ -388,8 +502,12 @@ def get_tokenizer(
         language = None
         task = None
 
-    encoding = get_encoding(name=encoding_name, num_languages=num_languages)
+    encoding, token_sets = _get_encoding(encoding_name, num_languages)
 
     return Tokenizer(
-        encoding=encoding, num_languages=num_languages, language=language, task=task
+        encoding=encoding,
+        num_languages=num_languages,
+        language=language,
+        task=task,
+        token_sets=token_sets,
     )
@@ -1,8 +1,9 @@
 import argparse
 import os
+import time
 import traceback
 import warnings
-from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -17,7 +18,13 @@ from .audio import (
     log_mel_spectrogram,
     pad_or_trim,
 )
-from .decoding import DecodingOptions, DecodingResult
+from .decoding import (
+    DecodingOptions,
+    DecodingResult,
+    DecodingTask,
+    TranscriptionObserver,
+    synchronized_time,
+)
 from .timing import add_word_timestamps
 from .tokenizer import LANGUAGES, TO_LANGUAGE_CODE, get_tokenizer
 from .utils import (
@@ -50,8 +57,11 @@ def transcribe(
     word_timestamps: bool = False,
     prepend_punctuations: str = "\"'“¿([{-",
     append_punctuations: str = "\"'.。,，!！?？:：”)]}、",
+    dtw_band: Optional[float] = None,
     clip_timestamps: Union[str, List[float]] = "0",
     hallucination_silence_threshold: Optional[float] = None,
+    audio_features: Optional[torch.Tensor] = None,
+    observer: Optional[TranscriptionObserver] = None,
     **decode_options,
 ):
     """
@@ -98,6 +108,11 @@ def transcribe(
     append_punctuations: str
         If word_timestamps is True, merge these punctuation symbols with the previous word
 
+    dtw_band: Optional[float]
+        If word_timestamps is True, restrict the dynamic time warping to a band around the diagonal
+        whose radius is this fraction of the segment duration, falling back to the full DTW when
+        the alignment reaches the edge of the band
+
     initial_prompt: Optional[str]
         Optional text to provide as a prompt for the first window. This can be used to provide, or
         "prompt-engineer" a context for transcription, e.g. custom vocabularies or proper nouns
@@ -119,6 +134,14 @@ def transcribe(
         When word_timestamps is True, skip silent periods longer than this threshold (in seconds)
         when a possible hallucination is detected
 
+    audio_features: Optional[torch.Tensor]
+        The encoded audio features of the first 30-second window, as returned by
+        `detect_transcription_language()`; used instead of running the encoder on that window
+
+    observer: Optional[TranscriptionObserver]
+        Receives the time spent on the spectrogram, the encoder, the decoder and the word
+        timestamps, and the decoder steps and temperature fallbacks of each window
+
     Returns
     -------
     A dictionary containing the resulting text ("text") and segment-level details ("segments"), and
@@ -136,7 +159,10 @@ def transcribe(
         decode_options["fp16"] = False
 
     # Pad 30-seconds of silence to the input audio, for slicing
+    start = time.perf_counter()
     mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    if observer is not None:
+        observer.mel_computed(synchronized_time(mel.device) - start)
     content_frames = mel.shape[-1] - N_FRAMES
     content_duration = float(content_frames * HOP_LENGTH / SAMPLE_RATE)
 
@@ -148,8 +174,13 @@ def transcribe(
                 print(
                     "Detecting language using up to the first 30 seconds. Use `--language` to specify the language"
                 )
-            mel_segment = pad_or_trim(mel, N_FRAMES).to(model.device).to(dtype)
-            _, probs = model.detect_language(mel_segment)
+            if audio_features is None:
+                # the encoded first window is kept for decoding, so it is only encoded once
+                probs, audio_features = detect_language_windows(
+                    model, mel, dtype, observer=observer
+                )
+            else:
+                _, probs = model.detect_language(audio_features)
             decode_options["language"] = max(probs, key=probs.get)
             if verbose is not None:
                 print(
@@ -181,13 +212,17 @@ def transcribe(
     if word_timestamps and task == "translate":
         warnings.warn("Word-level timestamps on translations may not be reliable.")
 
+    # only the prompt changes from one window to the next, so the decoding tasks set up for
+    # each fallback temperature are kept and updated instead of being built for every window
+    decoding_tasks: Dict[float, DecodingTask] = {}
+
     def decode_with_fallback(segment: torch.Tensor) -> DecodingResult:
         temperatures = (
             [temperature] if isinstance(temperature, (int, float)) else temperature
         )
         decode_result = None
 
-        for t in temperatures:
+        for fallbacks, t in enumerate(temperatures):
             kwargs = {**decode_options}
             if t > 0:
                 # disable beam_size and patience when t > 0
@@ -197,8 +232,14 @@ def transcribe(
                 # disable best_of when t == 0
                 kwargs.pop("best_of", None)
 
-            options = DecodingOptions(**kwargs, temperature=t)
-            decode_result = model.decode(segment, options)
+            if (decoding_task := decoding_tasks.get(t)) is None:
+                options = DecodingOptions(**kwargs, temperature=t)
+                decoding_task = decoding_tasks[t] = DecodingTask(
+                    model, options, observer
+                )
+            else:
+                decoding_task.update_prompt(kwargs.get("prompt"), kwargs.get("prefix"))
+            decode_result = decoding_task.run(segment.unsqueeze(0))[0]
 
             needs_fallback = False
             if (
@@ -221,6 +262,8 @@ def transcribe(
             if not needs_fallback:
                 break
 
+        if observer is not None:
+            observer.window_decoded(fallbacks)
         return decode_result
 
     clip_idx = 0
@@ -292,7 +335,16 @@ def transcribe(
             else:
                 decode_options["prompt"] = all_tokens[prompt_reset_since:]
 
-            result: DecodingResult = decode_with_fallback(mel_segment)
+            if (
+                audio_features is not None
+                and seek == 0
+                and segment_size == min(N_FRAMES, content_frames)
+            ):
+                # the first window has already been encoded for language detection
+                result: DecodingResult = decode_with_fallback(audio_features)
+            else:
+                result: DecodingResult = decode_with_fallback(mel_segment)
+            audio_features = None
             tokens = torch.tensor(result.tokens)
 
             if no_speech_threshold is not None:
@@ -399,6 +451,7 @@ def transcribe(
                 seek += segment_size
 
             if word_timestamps:
+                start = time.perf_counter()
                 add_word_timestamps(
                     segments=current_segments,
                     model=model,
@@ -408,7 +461,11 @@ def transcribe(
                     prepend_punctuations=prepend_punctuations,
                     append_punctuations=append_punctuations,
                     last_speech_timestamp=last_speech_timestamp,
+                    audio_features=result.audio_features,
+                    dtw_band=dtw_band,
                 )
+                if observer is not None:
+                    observer.word_timestamps_added(time.perf_counter() - start)
 
                 if not single_timestamp_ending:
                     last_word_end = get_end(current_segments)
@@ -514,6 +571,123 @@ def transcribe(
     )
 
 
+def mel_window(mel: torch.Tensor, seek: int = 0) -> torch.Tensor:
+    """
+    The 30-second window starting at frame `seek` of a Mel spectrogram computed with
+    `padding=N_SAMPLES`, padded the same way as the windows decoded by `transcribe()`
+    """
+    content_frames = mel.shape[-1] - N_FRAMES
+    segment_size = min(N_FRAMES, content_frames - seek)
+    return pad_or_trim(mel[:, seek : seek + segment_size], N_FRAMES)
+
+
+@torch.no_grad()
+def detect_language_windows(
+    model: "Whisper",
+    mel: torch.Tensor,
+    dtype: torch.dtype,
+    *,
+    max_windows: int = 1,
+    confidence_threshold: float = 0.9,
+    batch_size: int = 4,
+    observer: Optional[TranscriptionObserver] = None,
+) -> Tuple[Dict[str, float], torch.Tensor]:
+    """
+    Detect the spoken language from up to `max_windows` windows spread evenly across the audio.
+    The first window is checked on its own; if no language reaches `confidence_threshold`, the
+    remaining windows are encoded `batch_size` at a time and their language probabilities are
+    averaged, stopping as soon as the averaged distribution is confident enough. The encoder
+    passes and the detection as a whole are reported to `observer`, if given.
+
+    Returns
+    -------
+    language_probs : Dict[str, float]
+        the averaged probability distribution over all languages
+    audio_features : torch.Tensor, shape = (n_audio_ctx, n_audio_state)
+        the encoded first window
+    """
+    content_frames = mel.shape[-1] - N_FRAMES
+    last_seek = max(0, content_frames - N_FRAMES)
+    seeks = np.linspace(0, last_seek, max(1, max_windows)).round().astype(int)
+    seeks = sorted(set(seeks.tolist()))
+    batches = [seeks[:1]] + [
+        seeks[i : i + batch_size] for i in range(1, len(seeks), batch_size)
+    ]
+
+    detection_start = synchronized_time(model.device) if observer is not None else None
+    audio_features = None
+    window_probs = []
+    for batch in batches:
+        segments = torch.stack([mel_window(mel, seek) for seek in batch])
+        segments = segments.to(model.device).to(dtype)
+        if observer is not None:
+            start = synchronized_time(model.device)
+            features = model.embed_audio(segments)
+            observer.audio_encoded(synchronized_time(model.device) - start)
+        else:
+            features = model.embed_audio(segments)
+        if audio_features is None:
+            audio_features = features[0]
+
+        _, probs = model.detect_language(features)
+        window_probs.extend(probs)
+        language_probs = {
+            language: sum(p[language] for p in window_probs) / len(window_probs)
+            for language in window_probs[0]
+        }
+        if max(language_probs.values()) >= confidence_threshold:
+            break
+
+    if observer is not None:
+        observer.language_detected(
+            len(window_probs), synchronized_time(model.device) - detection_start
+        )
+    return language_probs, audio_features
+
+
+def detect_transcription_language(
+    model: "Whisper",
+    audio: Union[str, np.ndarray, torch.Tensor],
+    *,
+    fp16: bool = True,
+    max_windows: int = 1,
+    confidence_threshold: float = 0.9,
+    batch_size: int = 4,
+    observer: Optional[TranscriptionObserver] = None,
+) -> Tuple[str, Dict[str, float], torch.Tensor]:
+    """
+    Detect the spoken language as `transcribe()` would when no language is given. By default
+    only the first 30-second window is used; see `detect_language_windows()` for the meaning
+    of `max_windows`, `confidence_threshold`, `batch_size` and `observer`.
+
+    Returns
+    -------
+    language : str
+        the most probable language code
+    language_probs : Dict[str, float]
+        the probability distribution over all languages
+    audio_features : torch.Tensor, shape = (n_audio_ctx, n_audio_state)
+        the encoded first window, which can be passed to `transcribe(..., audio_features=...)`
+        to skip encoding it again
+    """
+    dtype = torch.float16 if fp16 else torch.float32
+    if model.device == torch.device("cpu"):
+        dtype = torch.float32
+
+    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    probs, audio_features = detect_language_windows(
+        model,
+        mel,
+        dtype,
+        max_windows=max_windows,
+        confidence_threshold=confidence_threshold,
+        batch_size=batch_size,
+        observer=observer,
+    )
+
+    return max(probs, key=probs.get), probs, audio_features
+
+
 def cli():
     from . import available_models
 
@@ -557,6 +731,7 @@ def cli():
     parser.add_argument("--word_timestamps", type=str2bool, default=False, help="(experimental) extract word-level timestamps and refine the results based on them")
     parser.add_argument("--prepend_punctuations", type=str, default="\"\'“¿([{-", help="if word_timestamps is True, merge these punctuation symbols with the next word")
     parser.add_argument("--append_punctuations", type=str, default="\"\'.。,，!！?？:：”)]}、", help="if word_timestamps is True, merge these punctuation symbols with the previous word")
+    parser.add_argument("--dtw_band", type=optional_float, default=None, help="(requires --word_timestamps True) restrict the word alignment to a band around the diagonal of this fraction of the segment duration, e.g. 0.1")
     parser.add_argument("--highlight_words", type=str2bool, default=False, help="(requires --word_timestamps True) underline each word as it is spoken in srt and vtt")
     parser.add_argument("--max_line_width", type=optional_int, default=None, help="(requires --word_timestamps True) the maximum number of characters in a line before breaking the line")
     parser.add_argument("--max_line_count", type=optional_int, default=None, help="(requires --word_timestamps True) the maximum number of lines in a segment")
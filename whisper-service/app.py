@@ -6,11 +6,16 @@ Real-time Dutch speech-to-text conversion using OpenAI Whisper
 
 import os
 import sys
+import json
 import tempfile
 import logging
 import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
 # Add whisper-main to Python path
@@ -19,16 +24,28 @@ sys.path.insert(0, str(whisper_path))
 
 try:
     import whisper
+    from whisper.transcribe import detect_transcription_language
+    from whisper.timing import warm_up_kernels
+    from whisper.decoding import TranscriptionObserver
     import torch
     import numpy as np
-    from flask import Flask, request, jsonify, Response
+    from flask import Flask, request, jsonify, Response, stream_with_context
     from flask_cors import CORS
     import librosa
     import soundfile as sf
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess
+    )
 except ImportError as e:
     print(f"Missing dependency: {e}")
     print("Please install required packages:")
-    print("pip install flask flask-cors librosa soundfile")
+    print("pip install flask flask-cors librosa soundfile prometheus-client")
     sys.exit(1)
 
 # Configure logging
@@ -44,9 +61,161 @@ CORS(app)  # Enable CORS for React frontend
 
 # Global variables
 whisper_model = None
-model_name = "base"  # Default model
+model_name = os.getenv('WHISPER_MODEL', "base")  # Whisper model, "base" by default
 supported_languages = ["nl", "en", "de", "fr", "es"]  # Dutch, English, German, French, Spanish
+detection_windows = 3  # 30-second windows sampled across the file for language detection
+max_detection_windows = 10  # Most windows a request may ask to sample, each costing an encoder pass
 processing_lock = threading.Lock()  # Prevent concurrent processing
+nlp_service_url = os.getenv('NLP_SERVICE_URL', 'http://localhost:5001')  # spaCy service that /transcribe-analyze hands transcripts to
+nlp_service_timeout = float(os.getenv('NLP_SERVICE_TIMEOUT', 300))  # Seconds to wait for the spaCy analysis of a transcript
+kernel_warm_up = os.getenv('WHISPER_KERNEL_WARM_UP', 'startup')  # 'startup' warms the timing kernels with the model, 'worker' leaves it to each server worker
+
+# Prometheus metrics, exported by /metrics; the transcriptions are labelled with the model and
+# the language they were transcribed in
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+upload_size_bytes = Histogram(
+    'whisper_upload_size_bytes', 'Size of the uploaded audio files',
+    ['model', 'language'], buckets=(16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6)
+)
+audio_duration_seconds = Histogram(
+    'whisper_audio_duration_seconds', 'Duration of the transcribed audio',
+    ['model', 'language'], buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+)
+audio_decode_seconds = Histogram(
+    'whisper_audio_decode_seconds', 'Time spent decoding the uploaded files to waveforms',
+    ['model', 'language'], buckets=SECONDS_BUCKETS
+)
+queue_wait_seconds = Histogram(
+    'whisper_queue_wait_seconds', 'Time decoded uploads waited for the model',
+    ['model', 'language'], buckets=SECONDS_BUCKETS
+)
+mel_seconds = Histogram(
+    'whisper_mel_seconds', 'Time spent computing the log-Mel spectrogram of a recording',
+    ['model', 'language'], buckets=SECONDS_BUCKETS
+)
+encoder_seconds = Histogram(
+    'whisper_encoder_seconds', 'Time spent in one forward pass of the audio encoder',
+    ['model', 'language'], buckets=SECONDS_BUCKETS
+)
+language_detection_seconds = Histogram(
+    'whisper_language_detection_seconds', 'Time spent detecting the spoken language, encoder passes included',
+    ['model', 'language'], buckets=SECONDS_BUCKETS
+)
+language_detection_windows = Histogram(
+    'whisper_language_detection_windows', '30-second windows encoded to detect the spoken language',
+    ['model', 'language'], buckets=(1, 2, 3, 4, 6, 8, 10)
+)
+decoder_seconds = Histogram(
+    'whisper_decoder_seconds', 'Time spent sampling the tokens of a 30-second window',
+    ['model', 'language'], buckets=SECONDS_BUCKETS
+)
+decoder_steps = Histogram(
+    'whisper_decoder_steps', 'Forward passes of the text decoder per 30-second window',
+    ['model', 'language'], buckets=(8, 16, 32, 64, 128, 224, 448, 896, 1344)
+)
+temperature_fallbacks = Histogram(
+    'whisper_temperature_fallbacks', 'Retries at a higher temperature per 30-second window',
+    ['model', 'language'], buckets=(0, 1, 2, 3, 4, 5)
+)
+word_timestamps_seconds = Histogram(
+    'whisper_word_timestamps_seconds', 'Time spent aligning the words of a 30-second window',
+    ['model', 'language'], buckets=SECONDS_BUCKETS
+)
+real_time_factor = Histogram(
+    'whisper_real_time_factor', 'Transcription time divided by the duration of the audio',
+    ['model', 'language'], buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8)
+)
+transcription_failures = Counter(
+    'whisper_transcription_failures_total', 'Transcriptions that raised an error',
+    ['model']
+)
+
+class TranscriptionMetrics(TranscriptionObserver):
+    """
+    Measurements of one transcription, from the upload to the result, collected as it runs and
+    observed by the histograms once the language is known
+    """
+
+    def __init__(self):
+        self.upload_bytes = None
+        self.decode_seconds = None
+        self.queue_wait_seconds = None
+        self.mel_seconds = None
+        self.encoder_seconds = []
+        self.language_detection = None  # (windows, seconds) when the language was detected
+        self.word_timestamps_seconds = []
+        self.windows = []  # (decoder steps, decoder seconds, fallbacks) of each window
+        self.window_steps = 0
+        self.window_seconds = 0.0
+
+    def mel_computed(self, seconds: float):
+        self.mel_seconds = seconds
+
+    def audio_encoded(self, seconds: float):
+        self.encoder_seconds.append(seconds)
+
+    def language_detected(self, windows: int, seconds: float):
+        self.language_detection = (windows, seconds)
+
+    def tokens_decoded(self, steps: int, seconds: float):
+        # a window is decoded again at each fallback; its steps add up
+        self.window_steps += steps
+        self.window_seconds += seconds
+
+    def window_decoded(self, fallbacks: int):
+        self.windows.append((self.window_steps, self.window_seconds, fallbacks))
+        self.window_steps, self.window_seconds = 0, 0.0
+
+    def word_timestamps_added(self, seconds: float):
+        self.word_timestamps_seconds.append(seconds)
+
+    def record(self, language: str, audio_duration: float, transcription_seconds: float):
+        """
+        Observe the measurements in the histograms
+
+        Args:
+            language: Language the audio was transcribed in
+            audio_duration: Duration of the audio in seconds
+            transcription_seconds: Time spent transcribing, including language detection
+        """
+        labels = (model_name, language)
+        if self.upload_bytes is not None:
+            upload_size_bytes.labels(*labels).observe(self.upload_bytes)
+        if self.decode_seconds is not None:
+            audio_decode_seconds.labels(*labels).observe(self.decode_seconds)
+        if self.queue_wait_seconds is not None:
+            queue_wait_seconds.labels(*labels).observe(self.queue_wait_seconds)
+        if self.mel_seconds is not None:
+            mel_seconds.labels(*labels).observe(self.mel_seconds)
+        self.record_detection(language)
+        for steps, seconds, fallbacks in self.windows:
+            decoder_steps.labels(*labels).observe(steps)
+            decoder_seconds.labels(*labels).observe(seconds)
+            temperature_fallbacks.labels(*labels).observe(fallbacks)
+        for seconds in self.word_timestamps_seconds:
+            word_timestamps_seconds.labels(*labels).observe(seconds)
+
+        audio_duration_seconds.labels(*labels).observe(audio_duration)
+        if audio_duration > 0:
+            real_time_factor.labels(*labels).observe(transcription_seconds / audio_duration)
+
+    def record_detection(self, language: str):
+        """Observe the encoder passes and the language detection, also of a detection without transcription"""
+        labels = (model_name, language)
+        for seconds in self.encoder_seconds:
+            encoder_seconds.labels(*labels).observe(seconds)
+        if self.language_detection is not None:
+            windows, seconds = self.language_detection
+            language_detection_windows.labels(*labels).observe(windows)
+            language_detection_seconds.labels(*labels).observe(seconds)
+
+def metrics_exposition() -> Tuple[bytes, str]:
+    """The metrics in the Prometheus text format and its content type, summed over the server's processes when it has several"""
+    registry = REGISTRY
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
 
 class WhisperService:
     """Whisper Speech-to-Text Service"""
@@ -55,7 +224,10 @@ class WhisperService:
         self.model_name = model_name
         self.model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.kernel_report = {}
         self.load_model()
+        if kernel_warm_up == "startup":
+            self.warm_up()
 
     def load_model(self):
         """Load Whisper model"""
@@ -67,13 +239,24 @@ class WhisperService:
             logger.error(f"Failed to load Whisper model: {e}")
             raise
 
+    def warm_up(self):
+        """Compile or load the word-timestamp kernels so the first request doesn't pay for the JIT"""
+        try:
+            start = time.time()
+            self.kernel_report = warm_up_kernels()
+            logger.info(f"Timing kernels ready in {time.time() - start:.2f}s: {self.kernel_report}")
+        except Exception as e:
+            logger.warning(f"Failed to warm up timing kernels: {e}")
+
     def transcribe_audio(
         self,
         audio_file_path: str,
         language: str = "nl",
         task: str = "transcribe",
         word_timestamps: bool = True,
-        initial_prompt: Optional[str] = None
+        initial_prompt: Optional[str] = None,
+        max_windows: int = detection_windows,
+        metrics: Optional[TranscriptionMetrics] = None
     ) -> Dict[str, Any]:
         """
         Transcribe audio file using Whisper
@@ -84,10 +267,13 @@ class WhisperService:
             task: 'transcribe' or 'translate'
             word_timestamps: Include word-level timestamps
             initial_prompt: Optional context prompt
+            max_windows: Windows sampled for language detection when language is 'auto'
+            metrics: Measurements of the request so far, e.g. its queue wait
 
         Returns:
             Dictionary with transcription results
         """
+        metrics = metrics or TranscriptionMetrics()
         try:
             logger.info(f"Transcribing audio file: {audio_file_path}")
             logger.info(f"Language: {language}, Task: {task}")
@@ -98,27 +284,85 @@ class WhisperService:
 
             file_size = os.path.getsize(audio_file_path)
             logger.info(f"Audio file size: {file_size} bytes")
+            metrics.upload_bytes = file_size
 
             if file_size == 0:
                 raise ValueError("Audio file is empty")
 
             # Test if we can load the audio file
             try:
+                start = time.perf_counter()
                 audio = whisper.load_audio(audio_file_path)
+                metrics.decode_seconds = time.perf_counter() - start
                 logger.info(f"Audio loaded successfully, shape: {audio.shape}")
             except Exception as audio_error:
                 logger.error(f"Failed to load audio file: {audio_error}")
                 raise Exception(f"Audio loading failed: {audio_error}")
 
-            # Transcribe with Whisper
+        except Exception as e:
+            logger.error(f"Transcription failed: {e}")
+            transcription_failures.labels(model_name).inc()
+            raise
+
+        return self.transcribe_waveform(
+            audio,
+            language=language,
+            task=task,
+            word_timestamps=word_timestamps,
+            initial_prompt=initial_prompt,
+            max_windows=max_windows,
+            metrics=metrics
+        )
+
+    def transcribe_waveform(
+        self,
+        audio: np.ndarray,
+        language: str = "nl",
+        task: str = "transcribe",
+        word_timestamps: bool = True,
+        initial_prompt: Optional[str] = None,
+        max_windows: int = detection_windows,
+        metrics: Optional[TranscriptionMetrics] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a decoded 16 kHz mono waveform using Whisper
+
+        Args:
+            audio: Waveform, as returned by whisper.load_audio
+            language: Language code (nl for Dutch)
+            task: 'transcribe' or 'translate'
+            word_timestamps: Include word-level timestamps
+            initial_prompt: Optional context prompt
+            max_windows: Windows sampled for language detection when language is 'auto'
+            metrics: Measurements of the request so far, e.g. its upload size and decode time
+
+        Returns:
+            Dictionary with transcription results
+        """
+        metrics = metrics or TranscriptionMetrics()
+        try:
+            start = time.perf_counter()
+
+            # Auto-detect the language, keeping the encoded first window for decoding
+            audio_features = None
+            if language == "auto":
+                language, _, audio_features = detect_transcription_language(
+                    self.model, audio, max_windows=max_windows, observer=metrics
+                )
+                logger.info(f"Detected language: {language}")
+
+            # Transcribe with Whisper, reusing the decoded waveform
             result = self.model.transcribe(
-                audio_file_path,
-                language=language if language in supported_languages else None,
+                audio,
+                language=language,
                 task=task,
                 word_timestamps=word_timestamps,
                 initial_prompt=initial_prompt,
+                audio_features=audio_features,
+                observer=metrics,
                 verbose=False
             )
+            transcription_seconds = time.perf_counter() - start
 
             # Validate result
             if result is None:
@@ -163,11 +407,18 @@ class WhisperService:
                 }
             }
 
+            metrics.record(
+                transcription_result["language"],
+                audio_duration=len(audio) / whisper.audio.SAMPLE_RATE,
+                transcription_seconds=transcription_seconds
+            )
+
             logger.info(f"Transcription completed. Text length: {len(text)} characters")
             return transcription_result
 
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
+            transcription_failures.labels(model_name).inc()
             raise
 
     def _calculate_duration(self, segments) -> float:
@@ -232,24 +483,31 @@ class WhisperService:
             logger.warning(f"Error calculating confidence: {e}")
             return 0.8  # Default confidence on error
 
-    def detect_language(self, audio_file_path: str) -> Dict[str, Any]:
-        """Detect language of audio file"""
+    def detect_language(self, audio_file_path: str, max_windows: int = detection_windows) -> Dict[str, Any]:
+        """Detect language of audio file, sampling up to max_windows 30-second windows"""
         try:
-            # Load audio and detect language
             audio = whisper.load_audio(audio_file_path)
-            audio = whisper.pad_or_trim(audio)
+        except Exception as e:
+            logger.error(f"Language detection failed: {e}")
+            raise
 
-            # Make log-Mel spectrogram
-            mel = whisper.log_mel_spectrogram(audio, n_mels=self.model.dims.n_mels).to(self.model.device)
+        return self.detect_waveform_language(audio, max_windows=max_windows)
 
-            # Detect language
-            _, probs = self.model.detect_language(mel)
+    def detect_waveform_language(self, audio: np.ndarray, max_windows: int = detection_windows) -> Dict[str, Any]:
+        """Detect language of a decoded waveform, sampling up to max_windows 30-second windows"""
+        try:
+            # Detect language; stops early once a window is confident
+            metrics = TranscriptionMetrics()
+            language, probs, _ = detect_transcription_language(
+                self.model, audio, max_windows=max_windows, observer=metrics
+            )
+            metrics.record_detection(language)
 
             # Get top 3 languages
             sorted_probs = sorted(probs.items(), key=lambda x: x[1], reverse=True)
 
             return {
-                "detected_language": max(probs, key=probs.get),
+                "detected_language": language,
                 "confidence": max(probs.values()),
                 "top_languages": sorted_probs[:3],
                 "all_probabilities": probs
@@ -259,26 +517,106 @@ class WhisperService:
             logger.error(f"Language detection failed: {e}")
             raise
 
+def analyze_transcript(text: str) -> Dict[str, Any]:
+    """
+    Analyze a transcript with the spaCy service, sending it only the text
+
+    Args:
+        text: Transcript text
+
+    Returns:
+        The analysis result of the spaCy service's /analyze endpoint
+    """
+    body = json.dumps({"text": text}).encode("utf-8")
+    nlp_request = urllib.request.Request(
+        f"{nlp_service_url}/analyze",
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(nlp_request, timeout=nlp_service_timeout) as response:
+            payload = json.load(response)
+    except urllib.error.HTTPError as e:
+        # the spaCy service reports its errors, including a full queue, as JSON
+        try:
+            error = json.load(e).get("error")
+        except ValueError:
+            error = None
+        raise Exception(f"NLP analysis failed with HTTP {e.code}: {error or e.reason}")
+    except urllib.error.URLError as e:
+        raise Exception(f"NLP service not reachable at {nlp_service_url}: {e.reason}")
+
+    if not payload.get("success"):
+        raise Exception(f"NLP analysis failed: {payload.get('error')}")
+    return payload["result"]
+
+def parse_detection_windows(value: Optional[str]) -> int:
+    """
+    Parse the detection_windows form field, clamped to 1..max_detection_windows
+
+    Args:
+        value: Form field value, None when the field is absent
+
+    Returns:
+        Number of 30-second windows to sample for language detection
+
+    Raises:
+        ValueError: If the value is not an integer
+    """
+    if value is None:
+        return detection_windows
+    try:
+        windows = int(value)
+    except ValueError:
+        raise ValueError(f"detection_windows must be an integer, got {value!r}")
+    return max(1, min(max_detection_windows, windows))
+
+@contextmanager
+def saved_upload(audio_file):
+    """Save an uploaded audio file to a temporary file, yielding its path and removing it afterwards"""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+    temp_file_path = temp_file.name
+    temp_file.close()  # Close the file handle so we can write to it
+
+    try:
+        audio_file.save(temp_file_path)
+
+        # Verify file exists and has content
+        if not os.path.exists(temp_file_path) or os.path.getsize(temp_file_path) == 0:
+            raise Exception("Failed to save audio file or file is empty")
+
+        logger.info(f"Saved audio file: {temp_file_path} ({os.path.getsize(temp_file_path)} bytes)")
+        yield temp_file_path
+
+    finally:
+        try:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+                logger.info(f"Cleaned up temporary file: {temp_file_path}")
+        except Exception as cleanup_error:
+            logger.warning(f"Failed to cleanup temporary file: {cleanup_error}")
+
 # Initialize Whisper service
 whisper_service = WhisperService(model_name)
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
+def health_info() -> Dict[str, Any]:
+    """Status of the service, as reported by /health"""
+    return {
         "status": "healthy",
         "service": "whisper-speech-to-text",
         "model": model_name,
         "device": whisper_service.device,
         "multilingual": whisper_service.model.is_multilingual if whisper_service.model else False,
         "supported_languages": supported_languages,
+        "kernels": whisper_service.kernel_report,
+        "nlp_service_url": nlp_service_url,
         "timestamp": datetime.now().isoformat()
-    })
+    }
 
-@app.route('/models', methods=['GET'])
-def get_available_models():
-    """Get available Whisper models"""
-    return jsonify({
+def models_info() -> Dict[str, Any]:
+    """Available Whisper models, as reported by /models"""
+    return {
         "available_models": whisper.available_models(),
         "current_model": model_name,
         "model_info": {
@@ -289,7 +627,23 @@ def get_available_models():
             "large": {"size": "1550M", "speed": "1x", "vram": "~10GB"},
             "turbo": {"size": "809M", "speed": "~8x", "vram": "~6GB"}
         }
-    })
+    }
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify(health_info())
+
+@app.route('/models', methods=['GET'])
+def get_available_models():
+    """Get available Whisper models"""
+    return jsonify(models_info())
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics of the transcriptions"""
+    body, content_type = metrics_exposition()
+    return Response(body, content_type=content_type)
 
 @app.route('/transcribe', methods=['POST'])
 def transcribe_audio():
@@ -315,33 +669,25 @@ def transcribe_audio():
         task = request.form.get('task', 'transcribe')
         word_timestamps = request.form.get('word_timestamps', 'true').lower() == 'true'
         initial_prompt = request.form.get('initial_prompt', None)
-
-        # Validate language
-        if language not in supported_languages:
-            return jsonify({"error": f"Unsupported language: {language}"}), 400
-
-        # Create temporary file with proper handling
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-        temp_file_path = temp_file.name
-        temp_file.close()  # Close the file handle so we can write to it
-
         try:
-            # Save uploaded file to temporary location
-            audio_file.save(temp_file_path)
-
-            # Verify file exists and has content
-            if not os.path.exists(temp_file_path) or os.path.getsize(temp_file_path) == 0:
-                raise Exception("Failed to save audio file or file is empty")
+            max_windows = parse_detection_windows(request.form.get('detection_windows'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-            logger.info(f"Saved audio file: {temp_file_path} ({os.path.getsize(temp_file_path)} bytes)")
+        # Validate language ('auto' detects it from windows sampled across the file)
+        if language != "auto" and language not in supported_languages:
+            return jsonify({"error": f"Unsupported language: {language}"}), 400
 
+        # Save uploaded file to a temporary location
+        with saved_upload(audio_file) as temp_file_path:
             # Transcribe audio
             result = whisper_service.transcribe_audio(
                 temp_file_path,
                 language=language,
                 task=task,
                 word_timestamps=word_timestamps,
-                initial_prompt=initial_prompt
+                initial_prompt=initial_prompt,
+                max_windows=max_windows
             )
 
             return jsonify({
@@ -349,15 +695,6 @@ def transcribe_audio():
                 "result": result
             })
 
-        finally:
-            # Clean up temporary file
-            try:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                    logger.info(f"Cleaned up temporary file: {temp_file_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"Failed to cleanup temporary file: {cleanup_error}")
-
     except Exception as e:
         logger.error(f"Transcription endpoint error: {e}")
         return jsonify({
@@ -368,9 +705,18 @@ def transcribe_audio():
         # Always release the processing lock
         processing_lock.release()
 
-@app.route('/detect-language', methods=['POST'])
-def detect_language():
-    """Detect language of uploaded audio file"""
+@app.route('/transcribe-analyze', methods=['POST'])
+def transcribe_and_analyze():
+    """
+    Transcribe uploaded audio and analyze the transcript with the spaCy service, streaming
+    NDJSON: a "transcript" line as soon as the transcription is done, then an "analysis" line
+    """
+    if not processing_lock.acquire(blocking=False):
+        return jsonify({
+            "success": False,
+            "error": "Another transcription is currently in progress. Please wait and try again."
+        }), 429  # Too Many Requests
+
     try:
         if 'audio' not in request.files:
             return jsonify({"error": "No audio file provided"}), 400
@@ -379,38 +725,73 @@ def detect_language():
         if audio_file.filename == '':
             return jsonify({"error": "No file selected"}), 400
 
-        # Create temporary file with proper handling
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-        temp_file_path = temp_file.name
-        temp_file.close()  # Close the file handle so we can write to it
+        language = request.form.get('language', 'nl')
+        if language != "auto" and language not in supported_languages:
+            return jsonify({"error": f"Unsupported language: {language}"}), 400
+        try:
+            max_windows = parse_detection_windows(request.form.get('detection_windows'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        with saved_upload(audio_file) as temp_file_path:
+            transcription = whisper_service.transcribe_audio(
+                temp_file_path,
+                language=language,
+                task=request.form.get('task', 'transcribe'),
+                word_timestamps=request.form.get('word_timestamps', 'true').lower() == 'true',
+                initial_prompt=request.form.get('initial_prompt', None),
+                max_windows=max_windows
+            )
+
+    except Exception as e:
+        logger.error(f"Transcribe-analyze endpoint error: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+    finally:
+        # released before the analysis, so the next transcription can start while spaCy runs
+        processing_lock.release()
+
+    def generate():
+        yield json.dumps({"type": "transcript", "success": True, "result": transcription}) + "\n"
 
         try:
-            # Save uploaded file to temporary location
-            audio_file.save(temp_file_path)
+            analysis = analyze_transcript(transcription["text"]) if transcription["text"] else None
+            line = {"type": "analysis", "success": True, "result": analysis}
+        except Exception as e:
+            logger.error(f"Transcript analysis failed: {e}")
+            line = {"type": "analysis", "success": False, "error": str(e)}
+        yield json.dumps(line) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/detect-language', methods=['POST'])
+def detect_language():
+    """Detect language of uploaded audio file"""
+    try:
+        if 'audio' not in request.files:
+            return jsonify({"error": "No audio file provided"}), 400
 
-            # Verify file exists and has content
-            if not os.path.exists(temp_file_path) or os.path.getsize(temp_file_path) == 0:
-                raise Exception("Failed to save audio file or file is empty")
+        audio_file = request.files['audio']
+        if audio_file.filename == '':
+            return jsonify({"error": "No file selected"}), 400
 
-            logger.info(f"Saved audio file for language detection: {temp_file_path} ({os.path.getsize(temp_file_path)} bytes)")
+        try:
+            max_windows = parse_detection_windows(request.form.get('detection_windows'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
+        # Save uploaded file to a temporary location
+        with saved_upload(audio_file) as temp_file_path:
             # Detect language
-            result = whisper_service.detect_language(temp_file_path)
+            result = whisper_service.detect_language(temp_file_path, max_windows=max_windows)
 
             return jsonify({
                 "success": True,
                 "result": result
             })
 
-        finally:
-            # Clean up temporary file
-            try:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                    logger.info(f"Cleaned up temporary file: {temp_file_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"Failed to cleanup temporary file: {cleanup_error}")
-
     except Exception as e:
         logger.error(f"Language detection endpoint error: {e}")
         return jsonify({
@@ -427,12 +808,6 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == '__main__':
-    # Check if model should be changed via environment variable
-    env_model = os.getenv('WHISPER_MODEL', model_name)
-    if env_model != model_name:
-        model_name = env_model
-        whisper_service = WhisperService(model_name)
-
     # Get port from environment or use default
     port = int(os.getenv('PORT', 5000))
 
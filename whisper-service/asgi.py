@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Whisper Speech-to-Text Service, asyncio variant
+Serves the endpoints of app.py from an ASGI app for uvicorn
+
+Uploads are received, and decoded by ffmpeg, without blocking the event loop, and the model runs
+in a dedicated thread: clients slowly uploading long recordings only hold a connection, not a
+worker, while the model transcribes the uploads that have arrived.
+
+Run with: uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Dict, Any
+
+from app import (
+    logger,
+    model_name,
+    whisper_service,
+    supported_languages,
+    parse_detection_windows,
+    nlp_service_url,
+    nlp_service_timeout,
+    health_info,
+    models_info,
+    metrics_exposition,
+    transcription_failures,
+    TranscriptionMetrics
+)
+
+try:
+    import httpx
+    import numpy as np
+    from starlette.applications import Starlette
+    from starlette.exceptions import HTTPException
+    from starlette.middleware import Middleware
+    from starlette.middleware.cors import CORSMiddleware
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+    from whisper.audio import SAMPLE_RATE, FFmpegDecoder, find_audio_decoder
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("Please install required packages:")
+    print("pip install starlette uvicorn python-multipart httpx")
+    sys.exit(1)
+
+max_pending_transcriptions = int(os.getenv('WHISPER_MAX_PENDING', 4))  # Transcriptions being received, queued or running at once; more are turned away with a 503
+max_upload_parts = 32  # Form fields and files accepted in one upload
+
+# One thread runs the model, so transcriptions take turns instead of competing for the cores;
+# PyTorch releases the GIL while it computes, which keeps the event loop responsive
+inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-inference")
+pending_transcriptions = 0
+
+async def run_blocking(function, *args, **kwargs):
+    """Run a blocking call, such as file I/O or JSON encoding, in the default thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(None, partial(function, *args, **kwargs))
+
+@asynccontextmanager
+async def inference_slot():
+    """
+    Reserve a transcription slot for a request before its upload is read and decoded, raising a
+    503 when all are taken; the slot is released however the request ends
+    """
+    global pending_transcriptions
+    if pending_transcriptions >= max_pending_transcriptions:
+        raise HTTPException(
+            503,
+            f"All {max_pending_transcriptions} transcription slots are busy, please try again later",
+            headers={"Retry-After": "60"}
+        )
+
+    pending_transcriptions += 1
+    try:
+        yield
+    finally:
+        pending_transcriptions -= 1
+
+async def run_inference(function, *args, **kwargs):
+    """Run a model call in the inference thread, where the calls take turns"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, partial(function, *args, **kwargs))
+
+async def json_response(content: Dict[str, Any], status_code: int = 200) -> Response:
+    """A JSON response encoded outside the event loop, as results of long recordings are large"""
+    body = await run_blocking(json.dumps, content)
+    return Response(body, status_code=status_code, media_type="application/json")
+
+@asynccontextmanager
+async def saved_upload(form):
+    """Write the uploaded audio file of a parsed form to a temporary file, yielding its path"""
+    audio_file = form.get('audio')
+    if audio_file is None or isinstance(audio_file, str):
+        raise HTTPException(400, "No audio file provided")
+    if not audio_file.filename:
+        raise HTTPException(400, "No file selected")
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+    temp_file_path = temp_file.name
+    try:
+        # the parser spooled the upload; copying it is file I/O, kept off the event loop
+        await audio_file.seek(0)
+        await run_blocking(shutil.copyfileobj, audio_file.file, temp_file)
+        await run_blocking(temp_file.close)
+
+        if os.path.getsize(temp_file_path) == 0:
+            raise Exception("Failed to save audio file or file is empty")
+
+        logger.info(f"Saved audio file: {temp_file_path} ({os.path.getsize(temp_file_path)} bytes)")
+        yield temp_file_path
+
+    finally:
+        temp_file.close()
+        await audio_file.close()
+        try:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+                logger.info(f"Cleaned up temporary file: {temp_file_path}")
+        except Exception as cleanup_error:
+            logger.warning(f"Failed to cleanup temporary file: {cleanup_error}")
+
+async def decode_audio(path: str) -> np.ndarray:
+    """
+    Decode an audio file to a 16 kHz mono waveform: formats that need ffmpeg in an asyncio
+    subprocess, PCM WAV and FLAC in-process in a thread
+    """
+    decoder = await run_blocking(find_audio_decoder, path, SAMPLE_RATE)
+    if not isinstance(decoder, FFmpegDecoder):
+        return await run_blocking(decoder.decode, path, SAMPLE_RATE)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *decoder.command(path, SAMPLE_RATE),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        raise Exception("Audio loading failed: ffmpeg not found")
+
+    out, err = await process.communicate()
+    if process.returncode != 0:
+        raise Exception(f"Audio loading failed: {err.decode(errors='replace')}")
+    return FFmpegDecoder.to_waveform(out)
+
+def detection_windows_option(form) -> int:
+    """The language-detection windows requested by an upload form, raising a 400 when invalid"""
+    try:
+        return parse_detection_windows(form.get('detection_windows'))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+def transcription_options(form) -> Dict[str, Any]:
+    """The transcription parameters of an upload form, as accepted by /transcribe"""
+    language = form.get('language', 'nl')
+
+    # Validate language ('auto' detects it from windows sampled across the file)
+    if language != "auto" and language not in supported_languages:
+        raise HTTPException(400, f"Unsupported language: {language}")
+
+    return {
+        "language": language,
+        "task": form.get('task', 'transcribe'),
+        "word_timestamps": form.get('word_timestamps', 'true').lower() == 'true',
+        "initial_prompt": form.get('initial_prompt', None),
+        "max_windows": detection_windows_option(form)
+    }
+
+async def transcribe_upload(request) -> Dict[str, Any]:
+    """Receive, decode and transcribe the audio file uploaded with the request, in a transcription slot"""
+    metrics = TranscriptionMetrics()
+    async with inference_slot():
+        try:
+            async with request.form(max_files=1, max_fields=max_upload_parts) as form:
+                options = transcription_options(form)
+                async with saved_upload(form) as temp_file_path:
+                    metrics.upload_bytes = os.path.getsize(temp_file_path)
+                    start = time.perf_counter()
+                    audio = await decode_audio(temp_file_path)
+                    metrics.decode_seconds = time.perf_counter() - start
+        except Exception:
+            # a rejected or undecodable upload is a failed transcription, as in app.py;
+            # transcribe_waveform counts the failures of the transcription itself
+            transcription_failures.labels(model_name).inc()
+            raise
+
+        logger.info(f"Audio loaded successfully, shape: {audio.shape}")
+        queued = time.perf_counter()
+
+        def transcribe():
+            metrics.queue_wait_seconds = time.perf_counter() - queued
+            return whisper_service.transcribe_waveform(audio, metrics=metrics, **options)
+
+        return await run_inference(transcribe)
+
+async def analyze_transcript(client: httpx.AsyncClient, text: str) -> Dict[str, Any]:
+    """Analyze a transcript with the spaCy service, like app.analyze_transcript but without blocking"""
+    try:
+        response = await client.post(f"{nlp_service_url}/analyze", json={"text": text})
+    except httpx.TransportError as e:
+        raise Exception(f"NLP service not reachable at {nlp_service_url}: {e}")
+
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = {}
+    if response.status_code != 200:
+        raise Exception(f"NLP analysis failed with HTTP {response.status_code}: {payload.get('error') or response.reason_phrase}")
+    if not payload.get("success"):
+        raise Exception(f"NLP analysis failed: {payload.get('error')}")
+    return payload["result"]
+
+async def health_check(request):
+    """Health check endpoint"""
+    info = health_info()
+    info["server"] = "asgi"
+    info["pending_transcriptions"] = pending_transcriptions
+    return JSONResponse(info)
+
+async def get_available_models(request):
+    """Get available Whisper models"""
+    return JSONResponse(models_info())
+
+async def get_metrics(request):
+    """Prometheus metrics of the transcriptions"""
+    body, content_type = metrics_exposition()
+    return Response(body, headers={"Content-Type": content_type})
+
+async def transcribe_audio(request):
+    """Transcribe uploaded audio file"""
+    try:
+        result = await transcribe_upload(request)
+        return await json_response({
+            "success": True,
+            "result": result
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Transcription endpoint error: {e}")
+        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+async def transcribe_and_analyze(request):
+    """
+    Transcribe uploaded audio and analyze the transcript with the spaCy service, streaming
+    NDJSON: a "transcript" line as soon as the transcription is done, then an "analysis" line
+    """
+    try:
+        transcription = await transcribe_upload(request)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Transcribe-analyze endpoint error: {e}")
+        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+    async def generate():
+        line = {"type": "transcript", "success": True, "result": transcription}
+        yield await run_blocking(json.dumps, line) + "\n"
+
+        try:
+            analysis = None
+            if transcription["text"]:
+                async with httpx.AsyncClient(timeout=nlp_service_timeout) as client:
+                    analysis = await analyze_transcript(client, transcription["text"])
+            line = {"type": "analysis", "success": True, "result": analysis}
+        except Exception as e:
+            logger.error(f"Transcript analysis failed: {e}")
+            line = {"type": "analysis", "success": False, "error": str(e)}
+        yield await run_blocking(json.dumps, line) + "\n"
+
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+async def detect_language(request):
+    """Detect language of uploaded audio file"""
+    try:
+        async with inference_slot():
+            async with request.form(max_files=1, max_fields=max_upload_parts) as form:
+                max_windows = detection_windows_option(form)
+                async with saved_upload(form) as temp_file_path:
+                    audio = await decode_audio(temp_file_path)
+
+            result = await run_inference(whisper_service.detect_waveform_language, audio, max_windows=max_windows)
+        return JSONResponse({
+            "success": True,
+            "result": result
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Language detection endpoint error: {e}")
+        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+async def http_error(request, exc: HTTPException):
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+async def internal_error(request, exc: Exception):
+    return JSONResponse({"error": "Internal server error"}, status_code=500)
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check, methods=['GET']),
+        Route('/models', get_available_models, methods=['GET']),
+        Route('/metrics', get_metrics, methods=['GET']),
+        Route('/transcribe', transcribe_audio, methods=['POST']),
+        Route('/transcribe-analyze', transcribe_and_analyze, methods=['POST']),
+        Route('/detect-language', detect_language, methods=['POST'])
+    ],
+    middleware=[
+        # Enable CORS for React frontend
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+    ],
+    exception_handlers={
+        HTTPException: http_error,
+        Exception: internal_error
+    }
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    # Get port from environment or use default
+    port = int(os.getenv('PORT', 5000))
+    logger.info(f"Starting asyncio Whisper service on port {port}")
+
+    uvicorn.run(app, host='0.0.0.0', port=port)
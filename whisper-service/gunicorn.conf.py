@@ -0,0 +1,72 @@
+"""
+Gunicorn configuration for serving the Whisper service in production
+
+Usage (from the whisper-service directory): gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden with the environment variables below. Gunicorn doesn't run
+on Windows; use `python app.py` there, or run the service in WSL or a container.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+wsgi_app = "app:app"
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+# Transcription is CPU-bound and each transcription already uses several cores through
+# PyTorch, so by default a few worker processes split the cores between them rather than many
+# competing for them. The split is untuned: no throughput was measured for it. On a GPU a
+# single worker keeps the model in memory once.
+cpu_count = multiprocessing.cpu_count()
+has_gpu = os.path.exists("/dev/nvidia0") and os.getenv('CUDA_VISIBLE_DEVICES') != ""
+workers = int(os.getenv('WEB_WORKERS', 1 if has_gpu else max(1, cpu_count // 4)))
+torch_threads = int(os.getenv('TORCH_THREADS', max(1, cpu_count // workers)))
+
+# One request at a time per worker: a worker transcribing doesn't accept the next upload,
+# which goes to an idle worker instead of being turned away with a 429
+worker_class = "sync"
+
+# A sync worker is restarted when a request runs longer than this, so it must cover the
+# longest recording expected
+timeout = int(os.getenv('WEB_TIMEOUT', 900))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 120))
+keepalive = 5
+
+# Each worker loads the model itself by default. With WEB_PRELOAD=true the model is loaded
+# once, before forking, and its weights are shared by the workers until they write to them.
+# That is only safe as long as the master starts no PyTorch or numba thread pool: pools used
+# before a fork hang in the child. The timing kernels are then warmed up in each worker rather
+# than on import, but that the master stays clear of OpenMP under concurrent transcriptions
+# hasn't been verified on a multi-core host, hence the default. Never preload on a GPU: CUDA
+# can't be used in a forked process once initialized.
+preload_app = os.getenv('WEB_PRELOAD', 'false').lower() == 'true'
+if preload_app:
+    os.environ.setdefault('WHISPER_KERNEL_WARM_UP', 'worker')
+
+# Each worker counts its own transcriptions; with several workers the Prometheus metrics are
+# written to files in a shared directory, set before the app imports prometheus_client, and
+# /metrics sums them up whichever worker answers the scrape
+if workers > 1 and 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix="whisper-metrics-")
+
+
+def post_fork(server, worker):
+    # before any inference, so that the workers split the cores instead of oversubscribing them
+    import torch
+
+    torch.set_num_threads(torch_threads)
+
+
+def post_worker_init(worker):
+    import app
+
+    if app.kernel_warm_up == "worker":
+        app.whisper_service.warm_up()
+
+
+def child_exit(server, worker):
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
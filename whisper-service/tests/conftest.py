@@ -0,0 +1,62 @@
+import os
+import shutil
+import sys
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+service_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(service_dir))
+sys.path.insert(0, str(service_dir.parent / "whisper-main"))
+
+checkpoint_dir = tempfile.mkdtemp()
+
+
+def pytest_configure(config):
+    # app.py loads WHISPER_MODEL when imported: a checkpoint of a tiny model with random
+    # weights keeps the tests from downloading one
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=64,
+        n_audio_head=2,
+        n_audio_layer=2,
+        n_vocab=51865,
+        n_text_ctx=448,
+        n_text_state=64,
+        n_text_head=2,
+        n_text_layer=2,
+    )
+    checkpoint = os.path.join(checkpoint_dir, "tiny-random.pt")
+    torch.manual_seed(0)
+    torch.save({"dims": dims.__dict__, "model_state_dict": Whisper(dims).state_dict()}, checkpoint)
+    os.environ["WHISPER_MODEL"] = checkpoint
+    os.environ.setdefault("WHISPER_KERNEL_WARM_UP", "worker")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def wav_upload(tmp_path):
+    """A second of quiet noise as a 16 kHz PCM WAV file, which decodes without ffmpeg"""
+    samples = np.random.RandomState(0).randint(-1000, 1000, 16000).astype("<i2")
+    path = tmp_path / "noise.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(samples.tobytes())
+    return path
+
+
+@pytest.fixture
+def transcription():
+    return {"text": "Ik werk sinds 2019 met Python.", "language": "nl", "segments": []}
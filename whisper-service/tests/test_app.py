@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(transcription, monkeypatch):
+    monkeypatch.setattr(app.whisper_service, "transcribe_audio", lambda path, **options: transcription)
+    return app.app.test_client()
+
+
+def post_upload(client, wav_upload):
+    with open(wav_upload, "rb") as f:
+        return client.post("/transcribe-analyze", data={"audio": (f, "noise.wav")})
+
+
+def test_transcribe_analyze_streams_the_transcript_then_the_analysis(client, wav_upload, transcription, monkeypatch):
+    analyzed = []
+
+    def analyze_transcript(text):
+        analyzed.append(text)
+        return {"skills": {"programming_languages": [{"name": "python"}]}}
+
+    monkeypatch.setattr(app, "analyze_transcript", analyze_transcript)
+    response = post_upload(client, wav_upload)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    transcript, analysis = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert transcript == {"type": "transcript", "success": True, "result": transcription}
+    assert analysis == {
+        "type": "analysis",
+        "success": True,
+        "result": {"skills": {"programming_languages": [{"name": "python"}]}},
+    }
+    assert analyzed == [transcription["text"]]
+    assert not app.processing_lock.locked()
+
+
+def test_transcribe_analyze_reports_a_failed_analysis(client, wav_upload, transcription, monkeypatch):
+    def analyze_transcript(text):
+        raise Exception("NLP service not reachable at http://localhost:5001")
+
+    monkeypatch.setattr(app, "analyze_transcript", analyze_transcript)
+    response = post_upload(client, wav_upload)
+
+    assert response.status_code == 200
+    transcript, analysis = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert transcript["result"] == transcription
+    assert analysis == {
+        "type": "analysis",
+        "success": False,
+        "error": "NLP service not reachable at http://localhost:5001",
+    }
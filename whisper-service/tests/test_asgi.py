@@ -0,0 +1,125 @@
+import json
+
+import pytest
+from prometheus_client import REGISTRY
+from starlette.testclient import TestClient
+
+import app
+import asgi
+
+
+@pytest.fixture
+def client(transcription, monkeypatch):
+    monkeypatch.setattr(app.whisper_service, "transcribe_waveform", lambda audio, **options: transcription)
+    return TestClient(asgi.app)
+
+
+def post_upload(client, wav_upload):
+    with open(wav_upload, "rb") as f:
+        return client.post("/transcribe-analyze", files={"audio": ("noise.wav", f, "audio/wav")})
+
+
+def test_transcribe_analyze_streams_the_transcript_then_the_analysis(client, wav_upload, transcription, monkeypatch):
+    analyzed = []
+
+    async def analyze_transcript(http_client, text):
+        analyzed.append(text)
+        return {"skills": {"programming_languages": [{"name": "python"}]}}
+
+    monkeypatch.setattr(asgi, "analyze_transcript", analyze_transcript)
+    response = post_upload(client, wav_upload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    transcript, analysis = [json.loads(line) for line in response.text.splitlines()]
+    assert transcript == {"type": "transcript", "success": True, "result": transcription}
+    assert analysis == {
+        "type": "analysis",
+        "success": True,
+        "result": {"skills": {"programming_languages": [{"name": "python"}]}},
+    }
+    assert analyzed == [transcription["text"]]
+
+
+def test_transcribe_analyze_reports_a_failed_analysis(client, wav_upload, transcription, monkeypatch):
+    async def analyze_transcript(http_client, text):
+        raise Exception("NLP analysis failed with HTTP 503: NLP service not available")
+
+    monkeypatch.setattr(asgi, "analyze_transcript", analyze_transcript)
+    response = post_upload(client, wav_upload)
+
+    assert response.status_code == 200
+    transcript, analysis = [json.loads(line) for line in response.text.splitlines()]
+    assert transcript["result"] == transcription
+    assert analysis == {
+        "type": "analysis",
+        "success": False,
+        "error": "NLP analysis failed with HTTP 503: NLP service not available",
+    }
+
+
+def test_health(client):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["server"] == "asgi"
+    assert response.json()["pending_transcriptions"] == 0
+
+
+@pytest.mark.parametrize("path", ["/transcribe", "/transcribe-analyze", "/detect-language"])
+def test_busy_service_answers_503_before_reading_the_upload(client, path, monkeypatch):
+    monkeypatch.setattr(asgi, "max_pending_transcriptions", 0)
+
+    # no audio file: a request whose form was read would get a 400
+    response = client.post(path, data={"language": "nl"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
+    assert "slots are busy" in response.json()["error"]
+
+
+def test_slots_are_released_after_failed_and_finished_requests(client, wav_upload):
+    assert client.post("/transcribe", data={"language": "xx"}).status_code == 400
+    assert asgi.pending_transcriptions == 0
+
+    with open(wav_upload, "rb") as f:
+        response = client.post("/transcribe", files={"audio": ("noise.wav", f, "audio/wav")})
+    assert response.status_code == 200
+    assert asgi.pending_transcriptions == 0
+
+
+def test_language_detection_reaches_the_metrics(client, wav_upload):
+    def observed(name, language):
+        value = REGISTRY.get_sample_value(name, {"model": app.model_name, "language": language})
+        return value or 0
+
+    with open(wav_upload, "rb") as f:
+        response = client.post(
+            "/detect-language", files={"audio": ("noise.wav", f, "audio/wav")}, data={"detection_windows": "2"}
+        )
+    assert response.status_code == 200
+    language = response.json()["result"]["detected_language"]
+
+    assert observed("whisper_language_detection_windows_sum", language) >= 1
+    assert observed("whisper_language_detection_seconds_count", language) >= 1
+    assert observed("whisper_encoder_seconds_count", language) >= 1
+
+
+def test_failed_uploads_are_counted(client, monkeypatch):
+    def failures():
+        return REGISTRY.get_sample_value("whisper_transcription_failures_total", {"model": app.model_name}) or 0
+
+    before = failures()
+    assert client.post("/transcribe", data={"language": "xx"}).status_code == 400
+    assert failures() == before + 1
+
+    # not a WAV or FLAC file: ffmpeg fails on it, or isn't installed
+    response = client.post("/transcribe", files={"audio": ("noise.mp3", b"not audio", "audio/mpeg")})
+    assert response.status_code == 500
+    assert "Audio loading failed" in response.json()["error"]
+    assert failures() == before + 2
+
+    # turned away before taking a slot: not a transcription
+    monkeypatch.setattr(asgi, "max_pending_transcriptions", 0)
+    assert client.post("/transcribe", data={"language": "nl"}).status_code == 503
+    assert failures() == before + 2